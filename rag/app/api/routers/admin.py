@@ -11,11 +11,13 @@ from app.schemas.responses import (
     UserListResponse, UserListItem, SystemStatsResponse,
     RefinementPreviewResponse, RefineCommitRequest
 )
-from app.storage.supabase import upload_document, delete_document as supabase_delete_document
+from app.storage.supabase import upload_document_streaming, delete_document as supabase_delete_document
 from app.rag.indexer import index_document_from_storage, index_refined_records, BibleRefiner
-from app.rag.vector_store import collection_exists, get_qdrant_client
+from app.workers.index_worker import request_index_check
+from app.rag.vector_store import acollection_exists, get_async_qdrant_client
 from qdrant_client import models
 from app.rag.constants import COLLECTION_NAME
+from app.core.cache import document_indexed_cache, retrieval_cache
 from datetime import datetime, timezone
 import re
 import asyncio
@@ -127,14 +129,16 @@ async def admin_delete_document(
                 from app.rag.constants import get_collection_name
                 target_collection = get_collection_name(category)
                 
-                if collection_exists(target_collection):
-                    client = get_qdrant_client()
-                    client.delete(
+                if await acollection_exists(target_collection):
+                    client = get_async_qdrant_client()
+                    await client.delete(
                         collection_name=target_collection,
                         points_selector=models.Filter(
                             must=[models.FieldCondition(key="file_path", match=models.MatchValue(value=storage_path))]
                         )
                     )
+                    document_indexed_cache.pop(storage_path, None)
+                    retrieval_cache.clear()
                     logger.info(f"Vectors deleted from collection: {target_collection}")
             except Exception as e:
                 logger.error(f"Vector deletion failed for {storage_path}: {e}")
@@ -172,10 +176,6 @@ async def admin_upload_document(
         if not file.filename:
             raise HTTPException(status_code=400, detail="Filename is required")
         
-        # Read file content upfront
-        content = await file.read()
-        file_size = len(content)
-        
         original_filename = file.filename
         file_ext = Path(original_filename).suffix
         file_base = Path(original_filename).stem
@@ -184,15 +184,6 @@ async def admin_upload_document(
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         unique_file_path = f"{safe_base}_{timestamp}{file_ext}"
         
-        # Calculate file size string
-        file_size_str = None
-        if file_size > 0:
-            size_mb = file_size / (1024 * 1024)
-            if size_mb < 1:
-                file_size_str = f"{file_size / 1024:.2f} KB"
-            else:
-                file_size_str = f"{size_mb:.2f} MB"
-        
         doc_metadata: dict = {}
         if metadata:
             try:
@@ -217,14 +208,24 @@ async def admin_upload_document(
             "created_at": datetime.now(timezone.utc).isoformat()
         })
         
-        from io import BytesIO
-        from fastapi import UploadFile
-        
-        # Upload to Supabase first
-        temp_file = UploadFile(filename=unique_file_path, file=BytesIO(content))
-        public_url = await upload_document(temp_file, unique_file_path, overwrite=False)
+        # Upload to Supabase first, streaming in chunks instead of reading the whole file
+        try:
+            public_url, file_size = await upload_document_streaming(file, unique_file_path, overwrite=False)
+        except ValueError:
+            # Rejected duplicate: don't leave the record stuck in "uploading"
+            await doc_repo.delete(doc_id)
+            raise
         await doc_repo.update(doc_id, {"status": "uploaded", "public_url": public_url})
         
+        # Calculate file size string from the streamed byte count
+        file_size_str = None
+        if file_size > 0:
+            size_mb = file_size / (1024 * 1024)
+            if size_mb < 1:
+                file_size_str = f"{file_size / 1024:.2f} KB"
+            else:
+                file_size_str = f"{size_mb:.2f} MB"
+        
         # Background indexing task
         async def process_document():
             """Background task for indexing (file already uploaded)."""
@@ -250,6 +251,8 @@ async def admin_upload_document(
             next_step="Document will be searchable shortly."
         )
 
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -399,3 +402,12 @@ async def update_user_role_endpoint(
         raise HTTPException(status_code=404, detail="User not found or role unchanged.")
         
     return {"status": "success", "message": f"User role updated to {role}."}
+
+@router.post("/index/check")
+async def request_index_check_endpoint(admin_id: str = Depends(get_current_admin)):
+    """
+    [ADMIN ONLY] Scan storage for unindexed documents now, in the background.
+    Intended as the target of a storage upload webhook; returns immediately.
+    """
+    request_index_check()
+    return {"status": "success", "message": "Index check scheduled."}
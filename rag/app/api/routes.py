@@ -2,10 +2,14 @@
 API routes for the RAG system.
 """
 
+import asyncio
+import logging
 import uuid
 import json
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
+from typing import AsyncIterator
+import pandas as pd
 from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Form, Depends
 from fastapi.responses import StreamingResponse
 from app.api.deps import get_current_user, get_optional_user, get_current_admin
@@ -15,8 +19,8 @@ from app.rag.constants import DEFAULT_TOP_K, COLLECTION_NAME
 from app.storage.supabase import upload_document, delete_document
 from app.schemas.requests import AskRequest, ProfileUpdate
 from app.rag.indexer import index_document_from_storage
-from app.rag.service import ask
-from app.rag.vector_store import collection_exists, get_qdrant_client
+from app.rag.service import ask, aresponse
+from app.rag.vector_store import acollection_exists, get_async_qdrant_client
 from qdrant_client import models
 from app.schemas.responses import (
     UploadResponse,
@@ -37,11 +41,91 @@ from app.storage.providers import Repositories
 from app.api.routers import auth
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/v1", tags=["rag"])
 
 # Include sub-routers
 router.include_router(auth.router, prefix="/auth", tags=["auth"])
 
+# Streamed answers are flushed once this many bytes are buffered or this much time has passed
+STREAM_FLUSH_BYTES = 4096
+STREAM_FLUSH_SECONDS = 0.02
+
+
+async def coalesce_stream(
+    chunks: AsyncIterator[str],
+    max_bytes: int = STREAM_FLUSH_BYTES,
+    max_wait: float = STREAM_FLUSH_SECONDS
+) -> AsyncIterator[bytes]:
+    """
+    Merge small streamed tokens into larger writes.
+    
+    A buffer is flushed when it reaches `max_bytes` or when `max_wait` seconds have
+    passed since its first chunk, so clients still see steady progress while the
+    server sends far fewer ASGI messages.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = chunks.__aiter__()
+    pending: asyncio.Future | None = None
+    buffer: list[bytes] = []
+    size = 0
+    deadline = 0.0
+    
+    try:
+        while True:
+            if pending is None:
+                # Keep the in-flight __anext__ across timeouts instead of cancelling it
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = max(0.0, deadline - loop.time()) if buffer else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            
+            if done:
+                try:
+                    chunk = pending.result()
+                except StopAsyncIteration:
+                    pending = None
+                    break
+                except Exception:
+                    # Deliver what the source produced before it failed
+                    pending = None
+                    if buffer:
+                        yield b"".join(buffer)
+                    raise
+                pending = None
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else str(chunk).encode("utf-8")
+                if not buffer:
+                    deadline = loop.time() + max_wait
+                buffer.append(data)
+                size += len(data)
+                if size < max_bytes:
+                    continue
+            
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+        
+        if buffer:
+            yield b"".join(buffer)
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+
+def _log_session_init_failure(task: asyncio.Task) -> None:
+    """Done-callback for the background session insert; cancellation (shutdown, client abort) is not a failure."""
+    if not task.cancelled() and task.exception():
+        logger.error(f"Session initialization failed: {task.exception()}")
+
+
+def stream_headers(conversation_id: str) -> dict[str, str]:
+    """Headers for a streamed chat answer."""
+    return {
+        "X-Conversation-Id": conversation_id,
+        "X-Content-Type-Options": "nosniff"
+    }
+
+
 def humanize_timestamp(timestamp_str: str | datetime | None) -> str:
     """
     Convert a timestamp string or datetime object to a human-readable format.
@@ -169,27 +253,28 @@ async def new_chat_endpoint(
     if not user_id:
         raise HTTPException(status_code=401, detail="User identification required.")
 
-    if not collection_exists():
+    if not await acollection_exists():
         raise HTTPException(status_code=503, detail="Vector store not initialized.")
     
     conversation_id = str(uuid.uuid4())
     chat_repo = await Repositories.chat()
-    await chat_repo.initialize_session(conversation_id, user_id=user_id)
+    # Create the session in the background so the first token isn't held behind the insert;
+    # ask() awaits it before persisting the turn
+    session_init = asyncio.create_task(chat_repo.initialize_session(conversation_id, user_id=user_id))
+    session_init.add_done_callback(_log_session_init_failure)
     
     if stream:
         return StreamingResponse(
-            ask(request.query, conversation_id, user_id=user_id, top_k=top_k, stream=True, model=request.model, mode=request.mode),
+            coalesce_stream(ask(request.query, conversation_id, user_id=user_id, top_k=top_k, stream=True, model=request.model, mode=request.mode, session_init=session_init)),
             media_type="text/plain",
-            headers={"X-Conversation-Id": conversation_id, "X-Content-Type-Options": "nosniff"}
+            headers=stream_headers(conversation_id)
         )
     else:
-        response_chunks = []
-        async for chunk in ask(request.query, conversation_id, user_id=user_id, top_k=top_k, stream=False, model=request.model, mode=request.mode):
-            response_chunks.append(chunk)
+        response = await aresponse(request.query, conversation_id, user_id=user_id, top_k=top_k, model=request.model, mode=request.mode, session_init=session_init)
         
         return AskResponse(
             conversation_id=conversation_id,
-            response="".join(response_chunks),
+            response=response,
             query=request.query,
             timestamp=datetime.now(timezone.utc).isoformat()
         )
@@ -213,27 +298,24 @@ async def continue_chat_endpoint(
         raise HTTPException(status_code=401, detail="User identification required.")
 
     chat_repo = await Repositories.chat()
-    session = await chat_repo.get_by_id_and_user(conversation_id, user_id)
-    if not session:
+    if not await chat_repo.is_owned_by(conversation_id, user_id):
         raise HTTPException(status_code=404, detail="Conversation not found.")
     
-    if not collection_exists():
+    if not await acollection_exists():
         raise HTTPException(status_code=503, detail="Vector store not initialized.")
     
     if stream:
         return StreamingResponse(
-            ask(request.query, conversation_id, user_id=user_id, top_k=top_k, stream=True, model=request.model, mode=request.mode),
+            coalesce_stream(ask(request.query, conversation_id, user_id=user_id, top_k=top_k, stream=True, model=request.model, mode=request.mode)),
             media_type="text/plain",
-            headers={"X-Conversation-Id": conversation_id, "X-Content-Type-Options": "nosniff"}
+            headers=stream_headers(conversation_id)
         )
     else:
-        response_chunks = []
-        async for chunk in ask(request.query, conversation_id, user_id=user_id, top_k=top_k, stream=False, model=request.model, mode=request.mode):
-            response_chunks.append(chunk)
+        response = await aresponse(request.query, conversation_id, user_id=user_id, top_k=top_k, model=request.model, mode=request.mode)
         
         return AskResponse(
             conversation_id=conversation_id,
-            response="".join(response_chunks),
+            response=response,
             query=request.query,
             timestamp=datetime.now(timezone.utc).isoformat()
         )
@@ -272,28 +354,30 @@ async def get_conversation_messages(
         raise HTTPException(status_code=401, detail="User identification required.")
 
     chat_repo = await Repositories.chat()
-    session = await chat_repo.get_by_id_and_user(conversation_id, user_id)
+    msg_repo = await Repositories.messages()
+    # Fetch the session and its turns concurrently; turns are discarded if the user doesn't own the session
+    session, interactions = await asyncio.gather(
+        chat_repo.get_by_id_and_user(conversation_id, user_id),
+        msg_repo.get_by_conversation(conversation_id, user_id=user_id, limit=limit)
+    )
     if not session:
         raise HTTPException(status_code=404, detail="Conversation not found")
-
-    msg_repo = await Repositories.messages()
-    interactions = await msg_repo.get_by_conversation(conversation_id, user_id=user_id, limit=limit)
     
+    # Parse all timestamps in one vectorized pass (handles datetimes and ISO strings);
+    # unparseable values fall back to "now" as before
+    timestamps = pd.to_datetime(
+        pd.Series([turn.get("created_at") for turn in interactions], dtype=object),
+        utc=True,
+        format="ISO8601",
+        errors="coerce"
+    ).fillna(pd.Timestamp.now(tz="UTC"))
+    
+    # Rows come from our own repository, so skip per-field validation
     message_responses = []
-    for turn in interactions:
-        created_at_str = turn.get("created_at")
-        try:
-            # Handle both datetime objects and ISO strings
-            if isinstance(created_at_str, datetime):
-                created_at = created_at_str
-            else:
-                created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-        except (ValueError, TypeError):
-            created_at = datetime.now(timezone.utc)
-        
+    for turn, created_at in zip(interactions, timestamps.tolist()):
         # 1. Add User query as a message
         message_responses.append(
-            MessageResponse(
+            MessageResponse.model_construct(
                 id=f"{turn.get('id', '')}_q",
                 conversation_id=conversation_id,
                 role="user",
@@ -306,7 +390,7 @@ async def get_conversation_messages(
         # 2. Add Assistant response as a message
         if turn.get("response"):
             message_responses.append(
-                MessageResponse(
+                MessageResponse.model_construct(
                     id=f"{turn.get('id', '')}_a",
                     conversation_id=conversation_id,
                     role="assistant",
@@ -340,20 +424,20 @@ async def list_conversations_endpoint(
     sessions = await chat_repo.get_recent_sessions(user_id, limit=limit)
     
     msg_repo = await Repositories.messages()
+    # One aggregation for every preview instead of a query per conversation
+    previews = await msg_repo.get_first_queries([sess.get("id") for sess in sessions], user_id=user_id)
     
     conversation_items = []
     for sess in sessions:
         conv_id = sess.get("id")
-        interactions = await msg_repo.get_by_conversation(conv_id, user_id=user_id, limit=1)
         
         last_message = None
-        if interactions:
-            # Use the query from the latest turn as physical last message preview
-            content = interactions[0].get("query", "")
+        if conv_id in previews:
+            content = previews[conv_id]
             last_message = content[:100] + "..." if len(content) > 100 else content
         
         conversation_items.append(
-            ConversationListItem(
+            ConversationListItem.model_construct(
                 conversation_id=conv_id,
                 title=sess.get("title"),
                 last_message=last_message,
@@ -386,9 +470,8 @@ async def health_check():
 
     # Qdrant check
     try:
-        from app.rag.vector_store import get_qdrant_client
-        client = get_qdrant_client()
-        client.get_collections()
+        client = get_async_qdrant_client()
+        await client.get_collections()
         dependencies["qdrant"] = "connected"
     except Exception as e:
         logger.error(f"Health check Qdrant ping failed: {e}")
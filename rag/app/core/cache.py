@@ -1,10 +1,14 @@
 import logging
 import hashlib
-import json
 import inspect
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Callable, Optional
-from cachetools import TTLCache
+from typing import Any, Callable, Hashable, List, Optional, Sequence
+import numpy as np
+import orjson
+from cachetools import LRUCache, TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +18,104 @@ translation_cache = TTLCache(maxsize=1000, ttl=86400)
 # Default LLM response cache: 500 items, expires in 1 hour
 llm_cache = TTLCache(maxsize=500, ttl=3600)
 
+# Query/variation text -> embedding vector: 4096 items, no expiry (embeddings are deterministic)
+embedding_cache = LRUCache(maxsize=4096)
+
+# Formatted retrieval context keyed by (node_id, score) tuples: 256 items, expires in 10 minutes
+formatted_context_cache = TTLCache(maxsize=256, ttl=600)
+
+# cachetools caches are not thread-safe, and these two are shared between the event loop and
+# retrieval running in worker threads; every read and write holds the matching lock
+embedding_cache_lock = threading.Lock()
+formatted_context_cache_lock = threading.Lock()
+
+# Existence lookups against Supabase Storage / Qdrant: 1024 paths, expires in 60 seconds.
+# Negative hits are stored too; writers invalidate entries explicitly.
+storage_exists_cache = TTLCache(maxsize=1024, ttl=60)
+document_indexed_cache = TTLCache(maxsize=1024, ttl=60)
+
+# Conversation ownership checks: (conversation_id, user_id) -> True, expires in 5 minutes.
+# Only positive results are stored; sessions are never reassigned to another user.
+conversation_owner_cache = TTLCache(maxsize=10_000, ttl=300)
+
+
+class SemanticCache:
+    """
+    Cache keyed by embedding similarity rather than exact input.
+    A lookup hits when a stored embedding in the same namespace has cosine
+    similarity >= `threshold` with the query embedding. Entries expire after
+    `ttl` seconds and the oldest are evicted past `maxsize`.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 600, threshold: float = 0.95):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries: OrderedDict[int, tuple[Hashable, float, np.ndarray, Any]] = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, namespace: Hashable, embedding: Sequence[float]) -> Optional[Any]:
+        """Return the value of the most similar live entry in `namespace`, or None."""
+        query = self._normalize(embedding)
+        now = time.monotonic()
+        with self._lock:
+            # Drop expired entries (oldest first) before searching
+            while self._entries:
+                oldest_id, (_, expires_at, _, _) = next(iter(self._entries.items()))
+                if expires_at > now:
+                    break
+                del self._entries[oldest_id]
+
+            candidates: List[tuple[np.ndarray, Any]] = [
+                (vector, value) for ns, _, vector, value in self._entries.values() if ns == namespace
+            ]
+            if not candidates:
+                return None
+
+            scores = np.stack([vector for vector, _ in candidates]) @ query
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return candidates[best][1]
+            return None
+
+    def set(self, namespace: Hashable, embedding: Sequence[float], value: Any) -> None:
+        """Store `value` under `embedding` in `namespace`."""
+        with self._lock:
+            self._entries[self._next_id] = (namespace, time.monotonic() + self.ttl, self._normalize(embedding), value)
+            self._next_id += 1
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Retrieval results for near-duplicate queries: 512 entries, expires in 10 minutes.
+# Cleared whenever documents are indexed or deleted.
+retrieval_cache = SemanticCache(maxsize=512, ttl=600, threshold=0.95)
+
+# Answers for paraphrased questions within a conversation: 1024 entries, expires in 1 hour.
+# Stricter threshold than retrieval: a near-miss here returns a wrong answer, not extra context.
+response_cache = SemanticCache(maxsize=1024, ttl=3600, threshold=0.97)
+
+
+def is_semantically_cacheable(normalized_query: str) -> bool:
+    """
+    Whether a near-duplicate query may reuse this query's cached results.
+    Numbers and "random" requests embed almost identically across different intents
+    (e.g. "1 to 10" vs "1 to 12"), so they only ever use exact-match caches.
+    """
+    return "random" not in normalized_query and not any(c.isdigit() for c in normalized_query)
+
+
 def generate_cache_key(prefix: str, *args, **kwargs) -> str:
     """Generate a stable cache key from arguments."""
     # Convert args and kwargs to a stable string
@@ -21,8 +123,8 @@ def generate_cache_key(prefix: str, *args, **kwargs) -> str:
         "args": [str(a) for a in args],
         "kwargs": {k: str(v) for k, v in sorted(kwargs.items())}
     }
-    key_str = json.dumps(key_content, sort_keys=True)
-    return f"{prefix}:{hashlib.sha256(key_str.encode()).hexdigest()}"
+    key_bytes = orjson.dumps(key_content, option=orjson.OPT_SORT_KEYS)
+    return f"{prefix}:{hashlib.sha256(key_bytes).hexdigest()}"
 
 def cached_translation(func: Callable):
     """Decorator to cache translation results."""
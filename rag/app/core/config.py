@@ -40,9 +40,24 @@ class Settings(BaseSettings):
     llm_provider: str = "google" # Default to google
     gemini_model: str = "gemini-1.5-flash" # Use stable Flash
     
+    # Embedding Configuration
+    # "onnx" runs the int8-quantized MiniLM export shipped in the model repo via ONNX Runtime;
+    # "torch" loads the original FP32 weights.
+    embedding_backend: str = "onnx"
+    embedding_onnx_file: str = "onnx/model_quint8_avx2.onnx"
+    # Threads dedicated to embedding inference; torch intra-op threads are divided between them
+    embedding_workers: int = 2
+    # Load the model and run one encode at startup so the first request doesn't pay for it
+    prewarm_embeddings: bool = True
+    
     # Qdrant Configuration
     qdrant_url: str = "http://localhost:6333"
     qdrant_api_key: Optional[str] = None
+    # gRPC (protobuf) transport for search/upsert; REST on qdrant_url is still used for the rest
+    qdrant_prefer_grpc: bool = True
+    qdrant_grpc_port: int = 6334
+    # gRPC channels per client; each channel multiplexes many concurrent calls
+    qdrant_pool_size: int = 16
     
     # CORS Configuration
     cors_origins: str | list[str] = Field(
@@ -0,0 +1,39 @@
+"""
+Shared outbound HTTP client.
+One pooled HTTP/2 client serves Supabase Storage and the OpenRouter LLM client,
+so connections (and their TLS handshakes) are reused across requests.
+"""
+
+from typing import Optional
+
+import httpx
+
+# Generous read timeout for archival uploads and LLM streams; callers that
+# need a tighter bound (e.g. existence probes) pass a per-request timeout
+HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get or create the shared HTTP client.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=HTTP_TIMEOUT,
+            limits=HTTP_LIMITS,
+            follow_redirects=True
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -1,11 +1,14 @@
+import inspect
 import logging
 import time
 from functools import wraps
 from typing import Any, Callable, TypeVar
+import httpx
 from tenacity import (
     retry,
     stop_after_attempt,
     wait_exponential,
+    retry_if_exception,
     retry_if_exception_type,
     before_sleep_log
 )
@@ -33,13 +36,50 @@ retry_llm = retry(
     reraise=True
 )
 
+def _is_transient_storage_error(exc: BaseException) -> bool:
+    """Network failures and 5xx responses are worth retrying; 4xx (e.g. duplicates, auth) are not."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    # storage3's StorageApiError carries the HTTP status as int or str
+    try:
+        return int(getattr(exc, "status", 0)) >= 500
+    except (TypeError, ValueError):
+        return False
+
+# Retry settings for Supabase Storage writes: quick first retry, capped exponential backoff.
+# Kept as keyword arguments too, for AsyncRetrying loops that need the attempt number.
+STORAGE_RETRY_POLICY: dict[str, Any] = dict(
+    stop=stop_after_attempt(7),
+    wait=wait_exponential(multiplier=0.1, min=0.1, max=10),
+    retry=retry_if_exception(_is_transient_storage_error),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True
+)
+retry_storage = retry(**STORAGE_RETRY_POLICY)
+
 def instrument_time(name: str):
     """
     Decorator to log execution time of a function.
     Useful for identifying bottlenecks (e.g., Retrieval vs LLM).
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        if name.startswith("async_") or "ask" in func.__name__:
+        if inspect.isasyncgenfunction(func):
+            # Streaming engines: time until the generator is exhausted (or closed)
+            @wraps(func)
+            async def async_gen_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                agen = func(*args, **kwargs)
+                try:
+                    async for item in agen:
+                        yield item
+                finally:
+                    await agen.aclose()
+                    end = time.perf_counter()
+                    logger.info(f"PERF: [{name}] took {end - start:.4f}s")
+            return async_gen_wrapper
+        elif inspect.iscoroutinefunction(func):
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
                 start = time.perf_counter()
@@ -6,17 +6,56 @@ Provides document upload and chat endpoints.
 import asyncio
 import logging
 from contextlib import asynccontextmanager
+from typing import Any
+
+import orjson
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.types import Receive, Scope, Send
 
 from app.rag.indexer import initial_index_if_needed
 from app.api.routes import router as legacy_router
 from app.api.routers import documents, admin
 from app.core.config import settings
+from app.storage.supabase_client import SupabaseManager, get_supabase
+from app.core.http import close_http_client
+from app.rag.vector_store import get_async_qdrant_client
+from app.rag.pdf import shutdown_pdf_executor
+from app.rag.service import reset_llm_chains
 
 logger = logging.getLogger(__name__)
 
 
+class UTCORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that renders naive datetimes as UTC with a 'Z' suffix."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+        )
+
+
+class ChatStreamAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that leaves chat endpoints uncompressed. Its compressor only emits data
+    when the response ends, which would hold every streamed token back until the answer
+    is complete; the non-streamed chat replies are small enough not to need it.
+    """
+
+    def __init__(self, app, excluded_prefixes: tuple[str, ...] = (), **kwargs):
+        super().__init__(app, **kwargs)
+        self.excluded_prefixes = excluded_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.excluded_prefixes):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
@@ -25,16 +64,33 @@ async def lifespan(app: FastAPI):
     # If Qdrant is not running, this will just log a warning
     async def init_qdrant():
         try:
-            initial_index_if_needed()
+            # Sync Qdrant client + model load; keep it off the event loop so startup isn't held up
+            await asyncio.to_thread(initial_index_if_needed)
             logger.info("Qdrant collection check complete")
             # Also ensure interaction storage indexes
             from app.storage.providers import Repositories
             msg_repo = await Repositories.messages()
-            await msg_repo.ensure_ttl_indexes()
-            logger.info("Database TTL indexes ensured")
+            chat_repo = await Repositories.chat()
+            await asyncio.gather(
+                msg_repo.ensure_ttl_indexes(),
+                msg_repo.ensure_query_indexes(),
+                chat_repo.ensure_query_indexes()
+            )
+            logger.info("Database indexes ensured")
         except Exception as e:
             logger.warning(f"Error during startup initialization: {e}")
 
+    async def warm_embeddings():
+        """Materialize the embedding model and run a throwaway encode."""
+        try:
+            from app.rag.embeddings import EMBED_EXECUTOR, get_embeddings
+            await asyncio.get_running_loop().run_in_executor(
+                EMBED_EXECUTOR, lambda: get_embeddings().get_text_embedding("warmup")
+            )
+            logger.info("Embedding model warmed up")
+        except Exception as e:
+            logger.warning(f"Embedding warmup failed: {e}")
+
     async def init_super_admin():
         """Auto-create super admin if configured and doesn't exist."""
         # Access the module-level settings before any shadowing imports
@@ -68,13 +124,38 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Error during super admin initialization: {e}")
 
+    loop_type = type(asyncio.get_running_loop())
+    logger.info(f"Event loop: {loop_type.__module__}.{loop_type.__name__}")
+
+    # Build the shared Supabase client once so requests never pay the handshake
+    try:
+        app.state.supabase = await get_supabase()
+    except Exception as e:
+        app.state.supabase = None
+        logger.warning(f"Supabase client unavailable during startup: {e}")
+
+    # Same for the async Qdrant client (construction only; connections open on first use)
+    try:
+        app.state.qdrant_async = get_async_qdrant_client()
+    except Exception as e:
+        app.state.qdrant_async = None
+        logger.warning(f"Qdrant async client unavailable during startup: {e}")
+
+    if settings.prewarm_embeddings:
+        asyncio.create_task(warm_embeddings())
     asyncio.create_task(init_qdrant())
     asyncio.create_task(init_super_admin())
     
     yield
     
     # Shutdown
-    # Resources (Supabase client, etc.) clean up automatically
+    await SupabaseManager.close()
+    await close_http_client()
+    # Cached LLM clients hold the closed HTTP client; a later lifespan must rebuild them
+    reset_llm_chains()
+    shutdown_pdf_executor()
+    if app.state.qdrant_async is not None:
+        await app.state.qdrant_async.close()
 
 
 app = FastAPI(
@@ -82,18 +163,30 @@ app = FastAPI(
     description="Production-ready RAG system using LlamaIndex, LangChain, Qdrant, Supabase, and OpenRouter",
     version="1.0.0",
     lifespan=lifespan,
-    redirect_slashes=False
+    redirect_slashes=False,
+    default_response_class=UTCORJSONResponse
 )
 
+# Allowed origins are frozen once so each CORS check is a set lookup rather than a list scan
+CORS_ORIGINS = frozenset(o.strip() for o in settings.cors_origins if o.strip())
+
 # CORS middleware - restricted to only required methods and headers
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins,
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type", "X-Anonymous-ID"],
     expose_headers=["X-Conversation-Id"],
-    max_age=3600,  # Cache preflight requests for 1 hour
+    max_age=86400,  # Cache preflight requests for 24 hours
+)
+
+# Compress larger payloads (e.g. conversation history); small responses go out as-is
+app.add_middleware(
+    ChatStreamAwareGZipMiddleware,
+    excluded_prefixes=("/api/v1/chat/",),
+    minimum_size=1024,
+    compresslevel=5
 )
 
 # Root endpoint
@@ -6,8 +6,17 @@ COLLECTION_NAME = "heritage_documents"
 DEFAULT_TOP_K = 5
 MIN_RELEVANCE_SCORE = 0.3
 MEMORY_WINDOW_SIZE = 10
+# Character budgets for history sent to the LLM (~4 chars per token)
+MEMORY_MAX_MESSAGE_CHARS = 2000
+MEMORY_MAX_TOTAL_CHARS = 6000
 INDEXER_INTERVAL_HOURS = 1
 
+# Post-response metadata refresh: titles settle after the first exchanges,
+# summaries drift slowly, so neither is regenerated every turn.
+# Turn 3 refreshes both, which takes a single combined LLM call.
+TITLE_REFRESH_TURNS = (1, 3)
+SUMMARY_REFRESH_EVERY_TURNS = 3
+
 # Collection Mapping based on category
 COLLECTION_MAP = {
     "bible": "bibele_documents",
@@ -3,26 +3,201 @@ HuggingFace embeddings module using llama-index-embeddings-huggingface.
 Provides shared embeddings instance for all components.
 """
 
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
 # Shared embeddings instance
 # Model: sentence-transformers/all-MiniLM-L6-v2 (free, local)
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# Output size of EMBEDDING_MODEL_NAME; fixed by the model, so no encode is needed to learn it
+EMBEDDING_DIM = 384
 _embeddings_instance = None
+# Startup warmup and indexer threads may both reach get_embeddings() first
+_embeddings_lock = threading.Lock()
+
+# Micro-batching limits for concurrent query embeddings
+EMBED_MAX_BATCH_SIZE = 64
+EMBED_MAX_WAIT_MS = 10
+EMBED_QUEUE_SIZE = 1024
+
+# Dedicated pool for embedding inference so encodes don't compete with other
+# to_thread work on the default executor
+EMBED_EXECUTOR = ThreadPoolExecutor(max_workers=settings.embedding_workers, thread_name_prefix="emb")
+
+
+def _configure_torch_threads() -> None:
+    """
+    Split the CPU cores between the embedding workers instead of letting every
+    concurrent encode spin up a full set of torch intra-op threads.
+    """
+    try:
+        import torch
+    except ImportError:
+        return
+    threads = max(1, (os.cpu_count() or 1) // max(1, settings.embedding_workers))
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set once, before any inter-op parallel work has started
+        pass
+
+
+_configure_torch_threads()
+
 
+class BatchedEmbedder:
+    """
+    Coalesces concurrent embedding requests into a single model forward pass.
+    Callers await `aembed`; a dispatcher drains up to `max_batch_size` pending
+    texts (or whatever arrives within `max_wait_ms`) and encodes them on `executor`
+    (the default executor if None), off the event loop.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = EMBED_MAX_BATCH_SIZE,
+        max_wait_ms: float = EMBED_MAX_WAIT_MS,
+        queue_size: int = EMBED_QUEUE_SIZE,
+        executor: Executor | None = None
+    ):
+        self._embed_batch = embed_batch
+        self._executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _ensure_dispatcher(self) -> asyncio.Queue:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._dispatcher = asyncio.create_task(self._dispatch(self._queue))
+        return self._queue
+
+    async def aembed(self, text: str) -> List[float]:
+        """Embed a single text, sharing the forward pass with concurrent callers."""
+        queue = self._ensure_dispatcher()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((text, future))
+        return await future
+
+    async def _dispatch(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
 
-def get_embeddings() -> HuggingFaceEmbedding:
+            texts = [text for text, _ in batch]
+            try:
+                vectors = await loop.run_in_executor(self._executor, self._embed_batch, texts)
+            except Exception as e:
+                logger.error(f"Batched embedding failed for {len(texts)} texts: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+
+class BatchedHuggingFaceEmbedding(HuggingFaceEmbedding):
+    """
+    HuggingFaceEmbedding whose async query path goes through a shared BatchedEmbedder,
+    so concurrent retrievals are encoded together instead of one forward pass each.
+    """
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return await (await _get_query_batcher()).aembed(query)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return await asyncio.get_running_loop().run_in_executor(EMBED_EXECUTOR, self._get_text_embedding, text)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.get_running_loop().run_in_executor(EMBED_EXECUTOR, self._get_text_embeddings, texts)
+
+
+_query_batcher: Optional[BatchedEmbedder] = None
+
+
+async def _get_query_batcher() -> BatchedEmbedder:
+    global _query_batcher
+
+    if _query_batcher is None:
+        model = await _aget_embeddings()
+        _query_batcher = BatchedEmbedder(
+            lambda texts: model._embed(texts, prompt_name="query"),
+            executor=EMBED_EXECUTOR
+        )
+
+    return _query_batcher
+
+
+def get_embeddings() -> BatchedHuggingFaceEmbedding:
     """
     Get or create shared HuggingFace embeddings instance.
-    
+
     Returns:
-        HuggingFaceEmbedding: Shared embeddings instance
+        BatchedHuggingFaceEmbedding: Shared embeddings instance
     """
     global _embeddings_instance
-    
-    if _embeddings_instance is None:
-        _embeddings_instance = HuggingFaceEmbedding(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
-    
+
+    if _embeddings_instance is not None:
+        return _embeddings_instance
+
+    with _embeddings_lock:
+        if _embeddings_instance is None and settings.embedding_backend == "onnx":
+            try:
+                _embeddings_instance = BatchedHuggingFaceEmbedding(
+                    model_name=EMBEDDING_MODEL_NAME,
+                    backend="onnx",
+                    model_kwargs={"file_name": settings.embedding_onnx_file}
+                )
+            except Exception as e:
+                logger.error(f"Quantized ONNX embedding model {settings.embedding_onnx_file} failed to load, falling back to FP32 torch: {e}")
+        
+        if _embeddings_instance is None:
+            _embeddings_instance = BatchedHuggingFaceEmbedding(
+                model_name=EMBEDDING_MODEL_NAME
+            )
+
     return _embeddings_instance
 
+
+async def _aget_embeddings() -> BatchedHuggingFaceEmbedding:
+    """
+    get_embeddings() for the event loop: until the model is loaded, the load (or the wait
+    for startup warmup to release _embeddings_lock) runs on EMBED_EXECUTOR.
+    """
+    if _embeddings_instance is not None:
+        return _embeddings_instance
+    return await asyncio.get_running_loop().run_in_executor(EMBED_EXECUTOR, get_embeddings)
+
+
+async def aembed(text: str) -> List[float]:
+    """
+    Embed a query without blocking the event loop.
+    Concurrent calls are micro-batched into a single model forward pass.
+    """
+    return await (await _aget_embeddings()).aget_query_embedding(text)
@@ -3,26 +3,44 @@ Document indexing module using LlamaIndex.
 Handles one-time indexing and document processing.
 """
 
+import asyncio
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
-from llama_index.core import VectorStoreIndex, Document
+from typing import Dict, List, Optional, Tuple
+from llama_index.core import Document
+from llama_index.core.schema import BaseNode
 from llama_index.core.node_parser import SentenceSplitter, MarkdownNodeParser
-import fitz  # PyMuPDF for PDF files
 import re
 import io
 import pandas as pd
 import docx
 import json
 
-from app.rag.embeddings import get_embeddings
-from app.rag.vector_store import get_vector_store, collection_exists, get_qdrant_client
+from app.rag.pdf import extract_pdf_text
+from app.rag.vector_store import get_vector_store, get_index, collection_exists, acollection_exists, get_async_qdrant_client
 from app.storage.service import StorageService
 from app.storage.supabase_client import get_supabase
 from app.rag.constants import COLLECTION_NAME, COLLECTION_MAP, get_collection_name
+from app.core.cache import document_indexed_cache, retrieval_cache
 
 logger = logging.getLogger(__name__)
 
+# Nodes embedded and upserted per insert call when indexing in bulk
+EMBED_INSERT_CHUNK_SIZE = 1000
+
+# Files read/parsed at once when indexing in bulk
+INDEX_CONCURRENCY = 16
+
+
+@lru_cache(maxsize=None)
+def _sentence_splitter(chunk_size: int) -> SentenceSplitter:
+    """
+    Shared splitter per chunk size; building one loads a tokenizer, so it is done once
+    rather than for every indexed file.
+    """
+    return SentenceSplitter(chunk_size=chunk_size, chunk_overlap=50)
+
 
 class BibleRefiner:
     """
@@ -248,11 +266,7 @@ class BibleRefiner:
         ext = filename.lower().split('.')[-1]
         try:
             if ext == 'pdf':
-                doc = fitz.open(stream=content, filetype="pdf")
-                text = ""
-                for page in doc:
-                    text += page.get_text()
-                return text
+                return extract_pdf_text(content)
             elif ext == 'docx':
                 doc = docx.Document(io.BytesIO(content))
                 return "\n".join([p.text for p in doc.paragraphs])
@@ -288,6 +302,7 @@ async def index_document_from_storage(file_path: str, metadata: Optional[dict] =
     """Index a single document directly from Supabase Storage."""
     content = await StorageService.download_file(file_path)
     await index_from_bytes(content, file_path, metadata)
+    document_indexed_cache.pop(file_path, None)
 
 
 async def index_refined_records(records: List[dict], metadata: Optional[dict] = None) -> None:
@@ -311,13 +326,9 @@ async def index_refined_records(records: List[dict], metadata: Optional[dict] =
     if not documents:
         return
 
-    # Use the unified indexer logic
-    VectorStoreIndex.from_documents(
-        documents,
-        storage_context=get_vector_store(COLLECTION_NAME),
-        embed_model=get_embeddings(),
-        show_progress=False
-    )
+    # Use the unified indexer logic (same chunking as Bible documents in index_from_bytes)
+    node_parser = _sentence_splitter(2048)
+    await _insert_nodes(COLLECTION_NAME, node_parser.get_nodes_from_documents(documents))
 
 
 async def index_from_bytes(content: bytes, file_path: str, metadata: Optional[dict] = None) -> None:
@@ -325,6 +336,77 @@ async def index_from_bytes(content: bytes, file_path: str, metadata: Optional[di
     Index a document directly from bytes in memory.
     Now with automated Bible Refinement pipeline.
     """
+    built = await build_nodes_from_bytes(content, file_path, metadata)
+    if built is None:
+        return
+    collection_name, nodes = built
+    await _insert_nodes(collection_name, nodes)
+
+
+async def index_documents_batch(
+    items: List[Tuple[bytes, str, Optional[dict]]],
+    embeddings_chunk_size: int = EMBED_INSERT_CHUNK_SIZE
+) -> None:
+    """
+    Index several documents with one embedding/upsert pass per collection.
+    
+    Args:
+        items: (content, file_path, metadata) for each document
+        embeddings_chunk_size: Number of nodes embedded and upserted per insert call
+    """
+    semaphore = asyncio.Semaphore(INDEX_CONCURRENCY)
+    
+    async def _build(content: bytes, file_path: str, metadata: Optional[dict]):
+        async with semaphore:
+            return await build_nodes_from_bytes(content, file_path, metadata)
+    
+    # Parse all documents concurrently; a failure in one file doesn't stop the rest
+    results = await asyncio.gather(*[_build(*item) for item in items], return_exceptions=True)
+    await _insert_built([file_path for _, file_path, _ in items], results, embeddings_chunk_size)
+
+
+async def _insert_built(
+    file_paths: List[str],
+    results: List[Optional[Tuple[str, List[BaseNode]]] | BaseException],
+    chunk_size: int = EMBED_INSERT_CHUNK_SIZE
+) -> None:
+    """Group built nodes by collection and insert them, logging the files that failed to build."""
+    nodes_by_collection: Dict[str, List[BaseNode]] = {}
+    for file_path, built in zip(file_paths, results):
+        if isinstance(built, Exception):
+            logger.error(f"Failed to prepare {file_path} for indexing: {built}")
+            continue
+        if built is None:
+            continue
+        collection_name, nodes = built
+        nodes_by_collection.setdefault(collection_name, []).extend(nodes)
+    
+    for collection_name, nodes in nodes_by_collection.items():
+        await _insert_nodes(collection_name, nodes, chunk_size)
+
+
+async def _insert_nodes(collection_name: str, nodes: List[BaseNode], chunk_size: int = EMBED_INSERT_CHUNK_SIZE) -> None:
+    """Embed and upsert nodes into a collection in slices of `chunk_size`."""
+    if not nodes:
+        return
+    index = get_index(collection_name)
+    for start in range(0, len(nodes), chunk_size):
+        await index.ainsert_nodes(nodes[start:start + chunk_size])
+    retrieval_cache.clear()
+
+
+async def build_nodes_from_bytes(content: bytes, file_path: str, metadata: Optional[dict] = None) -> Optional[Tuple[str, List[BaseNode]]]:
+    """
+    Extract, classify, parse and split a document into nodes without inserting them.
+    
+    Args:
+        content: Raw file bytes
+        file_path: Path to document in storage (used for type detection and metadata)
+        metadata: Optional metadata to attach to every node
+        
+    Returns:
+        Optional[Tuple[str, List[BaseNode]]]: Target collection name and nodes, or None if the file has no text
+    """
     file_path_obj = Path(file_path)
     file_extension = file_path_obj.suffix.lower()
     filename = file_path_obj.name
@@ -332,9 +414,8 @@ async def index_from_bytes(content: bytes, file_path: str, metadata: Optional[di
     text = ""
     # 1. Extraction Stage
     if file_extension == ".pdf":
-        doc = fitz.open(stream=content, filetype="pdf")
-        for page in doc: text += page.get_text()
-        doc.close()
+        # PyMuPDF parsing is CPU-bound; keep it off the event loop
+        text = await asyncio.to_thread(extract_pdf_text, content)
     elif file_extension in [".txt", ".md", ".json", ".jsonl"]:
         text = content.decode('utf-8', errors='ignore')
     elif file_extension == ".docx":
@@ -343,7 +424,7 @@ async def index_from_bytes(content: bytes, file_path: str, metadata: Optional[di
     else:
         text = content.decode('utf-8', errors='ignore')
 
-    if not text.strip(): return
+    if not text.strip(): return None
 
     # 2. Classification
     category = _detect_category(text, file_path)
@@ -413,9 +494,6 @@ async def index_from_bytes(content: bytes, file_path: str, metadata: Optional[di
         doc.excluded_embed_metadata_keys = list(set(doc.excluded_embed_metadata_keys + excluded_keys))
         doc.excluded_llm_metadata_keys = list(set(doc.excluded_llm_metadata_keys + excluded_keys))
 
-    embeddings = get_embeddings()
-    vector_store = get_vector_store(collection_name)
-    
     # Bible: larger chunks to handle verse metadata; JSONL heritage: already 1 doc per record, use small overlap
     if category == "bible":
         chunk_size = 2048
@@ -424,17 +502,16 @@ async def index_from_bytes(content: bytes, file_path: str, metadata: Optional[di
         chunk_size = 512
     else:
         chunk_size = 1024
-    node_parser = SentenceSplitter(chunk_size=chunk_size, chunk_overlap=50)
-    index = VectorStoreIndex.from_vector_store(vector_store=vector_store, embed_model=embeddings)
+    node_parser = _sentence_splitter(chunk_size)
     
-    for doc in documents:
-        nodes = node_parser.get_nodes_from_documents([doc])
-        await index.ainsert_nodes(nodes)
+    # Split every document in one call; insertion is batched by the caller
+    return collection_name, node_parser.get_nodes_from_documents(documents)
 
 
 async def is_document_indexed(file_path: str) -> bool:
     """
     Check if a document is already indexed in Qdrant by checking for nodes with matching file_path metadata.
+    Definite answers (including misses) are cached briefly; failures are never cached.
     
     Args:
         file_path: Path to document in storage
@@ -442,64 +519,91 @@ async def is_document_indexed(file_path: str) -> bool:
     Returns:
         bool: True if document is indexed, False otherwise
     """
+    if file_path in document_indexed_cache:
+        return document_indexed_cache[file_path]
+    
     try:
         from qdrant_client.models import Filter, FieldCondition, MatchValue
         
-        # Get Qdrant client
-        client = get_qdrant_client()
+        # Get Qdrant client (async, so the check never blocks the event loop)
+        client = get_async_qdrant_client()
         
         # Check if collection exists
-        if not collection_exists(COLLECTION_NAME):
+        if not await acollection_exists(COLLECTION_NAME):
             return False
         
-        # Search for any points with matching file_path in metadata
-        try:
-            # Use scroll to check for documents with matching metadata
-            # Check for file_path or filename in metadata
-            results = client.scroll(
-                collection_name=COLLECTION_NAME,
-                scroll_filter=Filter(
-                    must=[
-                        FieldCondition(
-                            key="file_path",
-                            match=MatchValue(value=file_path)
-                        )
-                    ]
-                ),
-                limit=1
-            )
-            
-            # If we found any points, the document is indexed
-            if results[0]:  # results is a tuple (points, next_page_offset)
-                return len(results[0]) > 0
-            
-            # Also check for filename in metadata (backward compatibility)
-            results = client.scroll(
+        # Existence check: fetch at most one bare point whose file_path (or legacy filename)
+        # matches, rather than counting every chunk of the document.
+        points, _ = await client.scroll(
+            collection_name=COLLECTION_NAME,
+            scroll_filter=Filter(
+                should=[
+                    FieldCondition(key="file_path", match=MatchValue(value=file_path)),
+                    FieldCondition(key="filename", match=MatchValue(value=file_path))
+                ]
+            ),
+            limit=1,
+            with_payload=False,
+            with_vectors=False
+        )
+        
+        indexed = bool(points)
+        document_indexed_cache[file_path] = indexed
+        return indexed
+        
+    except Exception as e:
+        # If anything fails, assume not indexed to be safe; re-indexing is the recoverable mistake
+        logger.warning(f"Indexed check failed for {file_path}: {e}")
+        return False
+
+
+async def is_document_indexed_batch(file_paths: List[str]) -> set[str]:
+    """
+    Check which of the given documents are already indexed, in one round-trip per payload key.
+    Uses a facet over file_path (then the legacy filename key for the rest), which returns each
+    distinct indexed path once regardless of how many chunks it has.
+    Falls back to per-file checks if the facet query is unavailable.
+
+    Args:
+        file_paths: Paths to documents in storage
+
+    Returns:
+        set[str]: The subset of file_paths that is indexed
+    """
+    indexed = {fp for fp in file_paths if document_indexed_cache.get(fp)}
+    pending = [fp for fp in dict.fromkeys(file_paths) if fp not in indexed and fp not in document_indexed_cache]
+    if not pending:
+        return indexed
+
+    if not await acollection_exists(COLLECTION_NAME):
+        return indexed
+
+    try:
+        from qdrant_client.models import Filter, FieldCondition, MatchAny
+
+        client = get_async_qdrant_client()
+        found: set[str] = set()
+        for key in ("file_path", "filename"):
+            remaining = [fp for fp in pending if fp not in found]
+            if not remaining:
+                break
+            result = await client.facet(
                 collection_name=COLLECTION_NAME,
-                scroll_filter=Filter(
-                    must=[
-                        FieldCondition(
-                            key="filename",
-                            match=MatchValue(value=file_path)
-                        )
-                    ]
-                ),
-                limit=1
+                key=key,
+                facet_filter=Filter(must=[FieldCondition(key=key, match=MatchAny(any=remaining))]),
+                limit=len(remaining),
+                exact=True
             )
-            
-            return len(results[0]) > 0 if results[0] else False
-            
-        except Exception:
-            # If scroll fails, try a different approach - just check if collection has any points
-            # This is a fallback - not as precise but better than nothing
-            collection_info = client.get_collection(COLLECTION_NAME)
-            # If collection exists and has points, we assume it might be indexed
-            # This is not perfect but works as a fallback
-            return collection_info.points_count > 0
-            
-    except Exception:
-        # If anything fails, assume not indexed to be safe
-        return False
+            found.update(str(hit.value) for hit in result.hits)
+
+        for fp in pending:
+            document_indexed_cache[fp] = fp in found
+        return indexed | found
+
+    except Exception as e:
+        logger.warning(f"Batched indexed check failed, checking {len(pending)} files individually: {e}")
+        results = await asyncio.gather(*(is_document_indexed(fp) for fp in pending))
+        return indexed | {fp for fp, is_indexed in zip(pending, results) if is_indexed}
 
 
 async def index_local_document(file_path: str, metadata: Optional[dict] = None) -> None:
@@ -512,7 +616,7 @@ async def index_local_document(file_path: str, metadata: Optional[dict] = None)
     """
     # Read file content
     local_path = Path(file_path)
-    content = local_path.read_bytes()
+    content = await asyncio.to_thread(local_path.read_bytes)
     
     # Index from bytes
     await index_from_bytes(content, file_path, metadata)
@@ -534,8 +638,17 @@ async def index_directory(directory_path: str, metadata: Optional[dict] = None)
     # Find all supported files
     files = [f for f in dir_path.rglob("*") if f.suffix.lower() in supported_extensions]
     
-    for file_path in files:
-        await index_local_document(str(file_path), metadata)
+    semaphore = asyncio.Semaphore(INDEX_CONCURRENCY)
+    
+    async def _build(path: Path):
+        # Read inside the task so at most INDEX_CONCURRENCY raw files are in memory at once
+        async with semaphore:
+            content = await asyncio.to_thread(path.read_bytes)
+            return await build_nodes_from_bytes(content, str(path), metadata)
+    
+    # Build nodes for every file concurrently, then embed and upsert them together
+    results = await asyncio.gather(*[_build(f) for f in files], return_exceptions=True)
+    await _insert_built([str(f) for f in files], results)
 
 
 
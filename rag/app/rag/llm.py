@@ -1,12 +1,17 @@
+from functools import lru_cache
+
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from app.core.config import settings
+from app.core.http import get_http_client
 
 
 def get_llm(temperature: float = 0.7, streaming: bool = True, model: str = None, **kwargs) -> ChatOpenAI | ChatGoogleGenerativeAI:
     """
     Get LLM instance (Google Gemini or OpenRouter).
+    Instances without extra kwargs are shared per (temperature, streaming, model), so
+    requests reuse the client's connection pool instead of opening new connections.
     
     Args:
         temperature: Sampling temperature
@@ -17,6 +22,25 @@ def get_llm(temperature: float = 0.7, streaming: bool = True, model: str = None,
     Returns:
         ChatOpenAI or ChatGoogleGenerativeAI instance
     """
+    if kwargs:
+        return _build_llm(temperature, streaming, model, **kwargs)
+    return _get_shared_llm(temperature, streaming, model)
+
+
+@lru_cache(maxsize=32)
+def _get_shared_llm(temperature: float, streaming: bool, model: str | None) -> ChatOpenAI | ChatGoogleGenerativeAI:
+    return _build_llm(temperature, streaming, model)
+
+
+def reset_shared_llms() -> None:
+    """
+    Drop the shared LLM instances. OpenRouter clients hold the shared HTTP client,
+    so this must follow close_http_client(); the next get_llm() rebuilds them.
+    """
+    _get_shared_llm.cache_clear()
+
+
+def _build_llm(temperature: float, streaming: bool, model: str | None, **kwargs) -> ChatOpenAI | ChatGoogleGenerativeAI:
     # 1. Determine provider and model_id
     effective_model = model or (settings.gemini_model if settings.llm_provider == "google" else settings.openrouter_model)
     
@@ -44,6 +68,7 @@ def get_llm(temperature: float = 0.7, streaming: bool = True, model: str = None,
             temperature=temperature,
             streaming=streaming,
             max_tokens=None,
+            http_async_client=get_http_client(),
             **kwargs
         )
 
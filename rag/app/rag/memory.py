@@ -4,23 +4,32 @@ Handles memory window (last N messages) and older message summarization.
 Uses MongoDB repositories for persistence.
 """
 
-from typing import List, Any
+from typing import List, Any, Tuple
+from pydantic import BaseModel, Field
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
 from app.rag.llm import get_llm
 from app.storage.providers import Repositories
-from app.rag.constants import MEMORY_WINDOW_SIZE
-from app.rag.prompts import SUMMARIZATION_PROMPT, TITLE_GENERATION_PROMPT
+from app.rag.constants import MEMORY_WINDOW_SIZE, MEMORY_MAX_MESSAGE_CHARS, MEMORY_MAX_TOTAL_CHARS
+from app.rag.prompts import SUMMARIZATION_PROMPT, TITLE_GENERATION_PROMPT, TITLE_SUMMARY_PROMPT
 
+# Stored role -> LangChain message class; unknown roles are treated as user input
+ROLE_MESSAGE_TYPES: dict[str, type[BaseMessage]] = {
+    "user": HumanMessage,
+    "assistant": AIMessage,
+    "system": SystemMessage
+}
 
-async def get_messages_helper(conversation_id: str, user_id: str = None, limit: int = MEMORY_WINDOW_SIZE) -> List[dict]:
+
+async def get_messages_helper(conversation_id: str, user_id: str = None, limit: int = MEMORY_WINDOW_SIZE, tail: bool = True) -> List[dict]:
     """
     Helper to get interactions from the repository and flatten them for memory/processing.
+    By default the most recent `limit` turns are fetched; pass tail=False for the opening turns.
     """
     repo = await Repositories.messages()
     # Note: limit refers to "turns" now, so 5 turns = 10 messages
-    interactions = await repo.get_by_conversation(conversation_id, user_id=user_id, limit=limit)
+    interactions = await repo.get_by_conversation(conversation_id, user_id=user_id, limit=limit, tail=tail)
     
     flattened = []
     for turn in interactions:
@@ -47,28 +56,62 @@ async def get_memory_window(conversation_id: str, user_id: str = None, window_si
     """
     messages_data = await get_messages_helper(conversation_id, user_id=user_id, limit=window_size)
     
-    langchain_messages: List[BaseMessage] = []
-    for msg in messages_data:
-        role = msg.get("role", "user")
+    return [
+        ROLE_MESSAGE_TYPES.get(msg.get("role", "user"), HumanMessage)(content=msg.get("content", ""))
+        for msg in messages_data
+    ]
+
+
+def trim_memory_window(
+    messages: List[dict],
+    max_message_chars: int = MEMORY_MAX_MESSAGE_CHARS,
+    max_total_chars: int = MEMORY_MAX_TOTAL_CHARS
+) -> List[dict]:
+    """
+    Bound the history sent to the LLM: each message is cut to `max_message_chars`, and
+    messages are kept newest-first until `max_total_chars` is used. Older turns are
+    already covered by the conversation summary.
+    """
+    kept: List[dict] = []
+    budget = max_total_chars
+    for msg in reversed(messages):
         content = msg.get("content", "")
-        
-        match role:
-            case "user":
-                langchain_messages.append(HumanMessage(content=content))
-            case "assistant":
-                langchain_messages.append(AIMessage(content=content))
-            case "system":
-                langchain_messages.append(SystemMessage(content=content))
-            case _:
-                langchain_messages.append(HumanMessage(content=content))
-    
-    return langchain_messages
+        if len(content) > max_message_chars:
+            content = content[:max_message_chars] + "…"
+        if len(content) > budget:
+            break
+        budget -= len(content)
+        kept.append({**msg, "content": content})
+    kept.reverse()
+    return kept
 
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+SUMMARIZATION_TEMPLATE = ChatPromptTemplate.from_template(SUMMARIZATION_PROMPT)
+TITLE_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", "You generate short (3-6 words) descriptive titles for Ga Heritage conversations."),
+    ("human", "User: {user_query}\nAssistant: {assistant_response}\n\nTitle:")
+])
+TITLE_SUMMARY_TEMPLATE = ChatPromptTemplate.from_template(TITLE_SUMMARY_PROMPT)
+
+async def _astream_text(chain, inputs: dict) -> str:
+    """
+    Stream a prompt | llm chain and join the chunks into one string.
+    Handles both string and list (multimodal) chunk content.
+    """
+    parts: List[str] = []
+    async for chunk in chain.astream(inputs):
+        content = chunk.content if hasattr(chunk, 'content') else str(chunk)
+        if isinstance(content, list):
+            parts.extend(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+        else:
+            parts.append(content)
+    return "".join(parts)
+
+
 async def summarize_conversation_messages(conversation_id: str, user_id: str = None, messages: List[dict] | None = None, model: str | None = None) -> str | None:
     """
     Summarize conversation messages (1 sentence max).
@@ -76,7 +119,7 @@ async def summarize_conversation_messages(conversation_id: str, user_id: str = N
     """
     try:
         if messages is None:
-            messages = await get_messages_helper(conversation_id, user_id=user_id, limit=10)
+            messages = await get_messages_helper(conversation_id, user_id=user_id, limit=5)
         
         if not messages:
             return None
@@ -90,22 +133,15 @@ async def summarize_conversation_messages(conversation_id: str, user_id: str = N
             for msg in messages[-10:]
         )
         
-        prompt_template = ChatPromptTemplate.from_template(SUMMARIZATION_PROMPT)
-        llm = get_llm(temperature=0.1, streaming=False, model=model) # Lower temp for summaries
-        chain = prompt_template | llm
+        llm = get_llm(temperature=0.1, streaming=True, model=model) # Lower temp for summaries
+        chain = SUMMARIZATION_TEMPLATE | llm
         
-        response = chain.invoke({
+        # Stream instead of a blocking invoke so the event loop keeps serving other requests
+        summary_text = await _astream_text(chain, {
             "summary": "No existing summary.",
             "messages": conversation_text
         })
         
-        # Handle both string and list content (multimodal)
-        content = response.content if hasattr(response, 'content') else str(response)
-        if isinstance(content, list):
-            summary_text = "".join([part.get("text", "") if isinstance(part, dict) else str(part) for part in content])
-        else:
-            summary_text = content
-        
         # Basic check to avoid conversational summaries
         if any(greet in summary_text.lower() for greet in ["hello", "hi ", "how are you", "let's start"]):
             return None
@@ -129,7 +165,7 @@ async def generate_conversation_title(conversation_id: str, user_id: str = None,
     """
     try:
         if messages is None:
-            messages = await get_messages_helper(conversation_id, user_id=user_id, limit=6)
+            messages = await get_messages_helper(conversation_id, user_id=user_id, limit=6, tail=False)
         
         if not messages:
             return None
@@ -137,21 +173,9 @@ async def generate_conversation_title(conversation_id: str, user_id: str = None,
         user_query = next((m.get('content') for m in messages if m.get('role') == 'user'), messages[0].get('content', ''))
         assistant_resp = next((m.get('content') for m in messages if m.get('role') == 'assistant'), "")
 
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("system", "You generate short (3-6 words) descriptive titles for Ga Heritage conversations."),
-            ("human", "User: {user_query}\nAssistant: {assistant_response}\n\nTitle:")
-        ])
-        
-        llm = get_llm(temperature=0.7, streaming=False, model=model)
-        chain = prompt_template | llm
-        response = chain.invoke({"user_query": user_query[:200], "assistant_response": assistant_resp[:300]})
-        
-        # Handle both string and list content (multimodal)
-        content = response.content if hasattr(response, 'content') else str(response)
-        if isinstance(content, list):
-            title_text = "".join([part.get("text", "") if isinstance(part, dict) else str(part) for part in content])
-        else:
-            title_text = content
+        llm = get_llm(temperature=0.7, streaming=True, model=model)
+        chain = TITLE_TEMPLATE | llm
+        title_text = await _astream_text(chain, {"user_query": user_query[:200], "assistant_response": assistant_resp[:300]})
         title_text = title_text.strip().strip('"').strip("'").strip()
         
         if title_text:
@@ -164,6 +188,52 @@ async def generate_conversation_title(conversation_id: str, user_id: str = None,
         return None
 
 
+class TitleSummary(BaseModel):
+    """Structured output for the combined title + summary call."""
+    title: str = Field(description="Short descriptive conversation title (3-6 words)")
+    summary: str = Field(description="One-sentence summary of the conversation topics")
+
+
+async def generate_title_and_summary(conversation_id: str, user_id: str = None, messages: List[dict] | None = None, model: str | None = None) -> Tuple[str | None, str | None]:
+    """
+    Generate a conversation title and summary with a single LLM call and save both in one write.
+    The summary is only kept once there are at least 3 messages, matching summarize_conversation_messages.
+    Fail-silent: returns (None, None) on any error.
+    """
+    try:
+        if messages is None:
+            messages = await get_messages_helper(conversation_id, user_id=user_id, limit=5)
+        
+        if not messages:
+            return None, None
+        
+        conversation_text = "\n\n".join(
+            f"{msg.get('role', 'user').capitalize()}: {msg.get('content', '')[:500]}"
+            for msg in messages[-10:]
+        )
+        
+        llm = get_llm(temperature=0.3, streaming=False, model=model).with_structured_output(TitleSummary)
+        chain = TITLE_SUMMARY_TEMPLATE | llm
+        result = await chain.ainvoke({"messages": conversation_text})
+        
+        title_text = result.title.strip().strip('"').strip("'").strip() or None
+        
+        summary_text = None
+        if len(messages) >= 3 and not any(greet in result.summary.lower() for greet in ["hello", "hi ", "how are you", "let's start"]):
+            summary_text = result.summary.strip().strip('"').strip("'").split('. ')[0] + '.'
+            if summary_text == "Conversation started.":
+                summary_text = None
+        
+        if title_text or summary_text:
+            repo = await Repositories.chat()
+            await repo.update_title_and_summary(conversation_id, title_text, summary_text)
+        
+        return title_text, summary_text
+    except Exception as e:
+        logger.error(f"Failed to generate title and summary for {conversation_id}: {e}")
+        return None, None
+
+
 async def get_conversation_context(conversation_id: str, user_id: str = None, model: str | None = None) -> dict[str, Any]:
     """
     Retrieve full conversation context (summary, title, messages) from MongoDB.
@@ -172,7 +242,7 @@ async def get_conversation_context(conversation_id: str, user_id: str = None, mo
     
     # 1. Parallel fetch of session and messages
     chat_repo = await Repositories.chat()
-    session_task = chat_repo.get_by_id_and_user(conversation_id, user_id)
+    session_task = chat_repo.get_meta(conversation_id, user_id)
     messages_task = get_messages_helper(conversation_id, user_id=user_id, limit=MEMORY_WINDOW_SIZE)
     
     session, messages_data = await asyncio.gather(session_task, messages_task)
@@ -182,11 +252,15 @@ async def get_conversation_context(conversation_id: str, user_id: str = None, mo
     
     # 2. Generate missing components if we have messages
     if messages_data:
-        if not title:
-            title = await generate_conversation_title(conversation_id, user_id=user_id, messages=messages_data, model=model)
-        
         # Only trigger dynamic summarization if we have a significant exchange
-        if not summary and len(messages_data) >= 3:
+        needs_summary = not summary and len(messages_data) >= 3
+        
+        if not title and needs_summary:
+            # Both missing: one LLM round-trip instead of two
+            title, summary = await generate_title_and_summary(conversation_id, user_id=user_id, messages=messages_data, model=model)
+        elif not title:
+            title = await generate_conversation_title(conversation_id, user_id=user_id, messages=messages_data, model=model)
+        elif needs_summary:
             summary = await summarize_conversation_messages(conversation_id, user_id=user_id, messages=messages_data, model=model)
     
     # 3. Format messages for UI/Service
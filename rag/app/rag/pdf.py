@@ -0,0 +1,90 @@
+"""
+PDF text extraction using PyMuPDF.
+Kept free of heavy imports so it can run inside spawned worker processes.
+"""
+
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import fitz  # PyMuPDF for PDF files
+
+# Documents with more pages than this are split across worker processes
+PARALLEL_PAGE_THRESHOLD = 16
+
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    """
+    Get or create the process pool used for large PDFs.
+    MuPDF is not thread-safe, so pages are extracted in separate processes,
+    each opening its own handle. Workers are spawned (not forked) to avoid
+    inheriting the server's threads and locks.
+    """
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_executor
+
+
+def shutdown_pdf_executor() -> None:
+    """Stop the PDF worker processes, if they were started (called on app shutdown)."""
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(cancel_futures=True)
+        _pdf_executor = None
+
+
+def _extract_pages(doc: fitz.Document, start: int, stop: int) -> str:
+    """Extract the text of pages [start, stop) from an open document."""
+    # Plain text in content-stream order; the layout sort pass isn't needed for indexing
+    return "".join(doc[i].get_text("text", sort=False) for i in range(start, stop))
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> str:
+    """Extract the text of pages [start, stop) from a PDF file (runs in a worker process)."""
+    doc = fitz.open(path, filetype="pdf")
+    try:
+        return _extract_pages(doc, start, stop)
+    finally:
+        doc.close()
+
+
+def extract_pdf_text(content: bytes) -> str:
+    """
+    Extract the text of every page of a PDF held in memory.
+    Large documents are split into contiguous page ranges extracted in parallel
+    and joined back in page order.
+
+    Args:
+        content: Raw PDF bytes
+
+    Returns:
+        str: Concatenated page text
+    """
+    doc = fitz.open(stream=content, filetype="pdf")
+    try:
+        page_count = doc.page_count
+        workers = min(os.cpu_count() or 1, page_count // PARALLEL_PAGE_THRESHOLD)
+        if workers <= 1:
+            return _extract_pages(doc, 0, page_count)
+    finally:
+        doc.close()
+
+    # Workers read the document from one temp file rather than each receiving a pickled copy
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(content)
+    try:
+        step = -(-page_count // workers)
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        executor = _get_pdf_executor()
+        futures = [executor.submit(_extract_page_range, tmp.name, start, stop) for start, stop in ranges]
+        return "".join(future.result() for future in futures)
+    finally:
+        os.unlink(tmp.name)
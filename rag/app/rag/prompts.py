@@ -75,10 +75,15 @@ CRITICAL RULES:
 - ZERO INTRO protocol: No greetings, no help, no conversational filler for scripture.
 - ZERO OUTRO protocol: No follow-up questions or "I hope this helps".
 - Stay strictly within the archive boundaries.
+"""
 
---------------------------------------------------------------------------
-GROUNDED ANSWER (from archives):
+# Per-request part of the persona prompt. Kept out of NII_OBODAI_PERSONA_PROMPT so the
+# system prompt is byte-identical across calls and providers can reuse its cached prefix.
+PERSONA_GROUNDED_ANSWER_PROMPT = """GROUNDED ANSWER (from archives):
 {grounded_answer}
+
+USER QUERY:
+{query}
 """
 
 SUMMARIZATION_PROMPT = """
@@ -106,4 +111,22 @@ Do not use quotes or special characters.
 Message: {query}
 
 Title:
-"""
\ No newline at end of file
+"""
+
+TITLE_SUMMARY_PROMPT = """
+Read the conversation below and produce both a title and a summary for it.
+
+TITLE RULES:
+1. 3-6 words, descriptive of the Ga Heritage topic discussed.
+2. Do not use quotes or special characters.
+
+SUMMARY RULES:
+1. One short, descriptive sentence covering the main topics.
+2. DO NOT greet the user or use conversational filler (e.g., "Hello", "Sure", "Let's start").
+3. DO NOT mention the summary itself.
+4. If there is nothing meaningful to summarize yet, use exactly: "Conversation started."
+5. Focus only on heritage topics, language questions, or documents mentioned.
+
+Conversation:
+{messages}
+"""
@@ -3,16 +3,43 @@ Document retrieval module using LlamaIndex.
 Handles retrieval of relevant chunks from vector store with flexible retry logic.
 """
 
+import logging
+import re
 from typing import List, Optional
-from llama_index.core import VectorStoreIndex, QueryBundle
+
+import orjson
+from llama_index.core import QueryBundle
 from llama_index.core.retrievers import VectorIndexRetriever
 from llama_index.core.schema import NodeWithScore
 from llama_index.core.vector_stores import MetadataFilter, MetadataFilters, FilterOperator, FilterCondition
+from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue, QueryRequest, SearchParams, QuantizationSearchParams
 
 from app.rag.embeddings import get_embeddings
-from app.rag.vector_store import get_vector_store
+from app.rag.vector_store import get_index
 from app.rag.constants import COLLECTION_NAME, COLLECTION_MAP, DEFAULT_TOP_K, MIN_RELEVANCE_SCORE
 from app.core.resilience import instrument_time
+from app.core.cache import (
+    embedding_cache,
+    embedding_cache_lock,
+    formatted_context_cache,
+    formatted_context_cache_lock,
+    is_semantically_cacheable,
+    retrieval_cache
+)
+
+logger = logging.getLogger(__name__)
+
+# Upload timestamps (_YYYYMMDD_HHMMSS) stripped from source citations
+TIMESTAMP_SUFFIX_RE = re.compile(r'_\d{8}_\d{6}')
+
+# Int8-quantized collections are searched on 2x top_k candidates, then rescored with the
+# original vectors so recall matches full precision; ignored for unquantized collections
+QUANTIZED_SEARCH_PARAMS = SearchParams(
+    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+
+# Metadata keys present in every collection; other filters are Bible-only
+SHARED_FILTER_KEYS = frozenset({"category", "file_path", "filename"})
 
 
 def get_retriever(top_k: int = DEFAULT_TOP_K) -> VectorIndexRetriever:
@@ -25,18 +52,9 @@ def get_retriever(top_k: int = DEFAULT_TOP_K) -> VectorIndexRetriever:
     Returns:
         VectorIndexRetriever: Retriever instance
     """
-    embeddings = get_embeddings()
-    vector_store = get_vector_store(COLLECTION_NAME)
-    
-    # Create index from existing vector store
-    index = VectorStoreIndex.from_vector_store(
-        vector_store=vector_store,
-        embed_model=embeddings
-    )
-    
-    # Create retriever
+    # Retrievers are cheap; the index behind them is built once per collection
     retriever = VectorIndexRetriever(
-        index=index,
+        index=get_index(COLLECTION_NAME),
         similarity_top_k=top_k
     )
     
@@ -111,7 +129,83 @@ def _get_intent_filters(query: str) -> Optional[MetadataFilters]:
 
 def _has_relevant_results(nodes: List[NodeWithScore], min_score: float = MIN_RELEVANCE_SCORE) -> bool:
     """Check if retrieved nodes have relevant results based on similarity scores."""
-    return any((getattr(node, 'score', 0.0) >= min_score) for node in nodes)
+    return any(node.score is not None and node.score >= min_score for node in nodes)
+
+
+def _embed_variations(variations: List[str]) -> List[List[float]]:
+    """
+    Embed query variations, reusing cached vectors and batch-embedding only the misses.
+    """
+    with embedding_cache_lock:
+        vectors = {v: embedding_cache.get(v) for v in variations}
+    missing = [v for v, vector in vectors.items() if vector is None]
+    if missing:
+        # Keep the batch result locally: concurrent inserts may evict it from the cache at any time
+        embedded = get_embeddings().get_text_embedding_batch(missing)
+        vectors.update(zip(missing, embedded))
+        with embedding_cache_lock:
+            embedding_cache.update(zip(missing, embedded))
+    return [vectors[v] for v in variations]
+
+
+def _to_qdrant_filter(filters: Optional[MetadataFilters]) -> Optional[Filter]:
+    """
+    Translate the metadata filters used here (equality and IN on top-level payload keys)
+    into a Qdrant filter, so batch queries don't depend on llama-index internals.
+    """
+    if not filters or not filters.filters:
+        return None
+    
+    conditions = []
+    for f in filters.filters:
+        if f.operator == FilterOperator.EQ:
+            conditions.append(FieldCondition(key=f.key, match=MatchValue(value=f.value)))
+        elif f.operator == FilterOperator.IN:
+            conditions.append(FieldCondition(key=f.key, match=MatchAny(any=f.value)))
+        else:
+            raise ValueError(f"Unsupported filter operator for '{f.key}': {f.operator}")
+    
+    if filters.condition == FilterCondition.OR:
+        return Filter(should=conditions)
+    return Filter(must=conditions)
+
+
+def _search_variations(
+    collection_name: str,
+    vectors: List[List[float]],
+    top_k: int,
+    filters: Optional[MetadataFilters]
+) -> List[List[NodeWithScore]]:
+    """
+    Run one Qdrant batch query for all query-variation embeddings against a collection.
+    Returns one result list per vector, in the same order.
+    """
+    vector_store = get_index(collection_name).vector_store
+    query_filter = _to_qdrant_filter(filters)
+    
+    # Collections hold a single unnamed vector (see _create_collection), so no `using`
+    responses = vector_store.client.query_batch_points(
+        collection_name=collection_name,
+        requests=[
+            QueryRequest(
+                query=vector,
+                limit=top_k,
+                filter=query_filter,
+                params=QUANTIZED_SEARCH_PARAMS,
+                with_payload=True
+            )
+            for vector in vectors
+        ]
+    )
+    
+    results = []
+    for response in responses:
+        parsed = vector_store.parse_to_query_result(response.points)
+        results.append([
+            NodeWithScore(node=node, score=score)
+            for node, score in zip(parsed.nodes, parsed.similarities)
+        ])
+    return results
 
 
 @instrument_time("Vector_Retrieval")
@@ -120,14 +214,15 @@ def retrieve_context(
     top_k: int = DEFAULT_TOP_K, 
     max_retries: int = 2,
     filters: Optional[MetadataFilters] = None,
-    allowed_collections: Optional[List[str]] = None
+    allowed_collections: Optional[List[str]] = None,
+    query_embedding: Optional[List[float]] = None
 ) -> List[NodeWithScore]:
     """
     Retrieve relevant context chunks.
     If allowed_collections is provided, strictly search only those collections.
     Otherwise, search across all available collections in COLLECTION_MAP.
+    If query_embedding is provided, it is used for the query itself instead of re-embedding it.
     """
-    embeddings = get_embeddings()
     all_nodes: List[NodeWithScore] = []
     
     # Auto-detect intent filters if not provided
@@ -165,16 +260,24 @@ def retrieve_context(
     # Remove duplicates but preserve order
     variations = list(dict.fromkeys(variations))
     
-    # 3. Search across all collections
+    # 3. Embed the query itself (variations[0]) first: a semantic cache hit needs nothing else
+    query_vector = query_embedding if query_embedding is not None else _embed_variations(variations[:1])[0]
+    
+    # Near-duplicate queries with the same scope reuse earlier results; numeric and
+    # "random" requests look alike across intents, so they always search
+    cache_namespace = (top_k, tuple(target_collections), repr(filters))
+    use_cache = is_semantically_cacheable(query.lower().strip())
+    if use_cache:
+        cached = retrieval_cache.get(cache_namespace, query_vector)
+        if cached is not None:
+            logger.debug(f"Semantic cache hit for query: {query}")
+            return cached
+    
+    # Embed the remaining variations once, then search each collection with a single batch query
+    variation_vectors = [query_vector] + _embed_variations(variations[1:])
+    
     for coll in target_collections:
         try:
-            vector_store = get_vector_store(coll)
-            index = VectorStoreIndex.from_vector_store(
-                vector_store=vector_store,
-                embed_model=embeddings
-            )
-            
-            # Create retriever for this specific collection
             # Pass filters ONLY if they are relevant to this collection
             # "bible" collection supports book/chapter/verse. Others might not.
             active_filters = filters
@@ -182,16 +285,10 @@ def retrieve_context(
                 # Remove verse/book/chapter filters for non-bible collections to avoid 400 errors
                 active_filters = MetadataFilters(filters=[
                     f for f in filters.filters 
-                    if f.key in ["category", "file_path", "filename"]
+                    if f.key in SHARED_FILTER_KEYS
                 ], condition=filters.condition)
             
-            retriever = index.as_retriever(
-                similarity_top_k=top_k,
-                filters=active_filters
-            )
-            
-            for variant in variations:
-                nodes = retriever.retrieve(QueryBundle(query_str=variant))
+            for nodes in _search_variations(coll, variation_vectors, top_k, active_filters):
                 if nodes:
                     all_nodes.extend(nodes)
                     # If we found exact matches via filters, we might be able to stop early
@@ -215,13 +312,14 @@ def retrieve_context(
     seen_nodes = {}
     from app.rag.validator import is_retrievable_bible_record
     
-    for n in all_nodes:
-        metadata = n.node.metadata if hasattr(n.node, 'metadata') else {}
-        
-        # [HARD VALIDATION LAYER] Drop entirely malformed or noise-polluted Bible nodes 
-        if metadata.get("category") == "bible" and not is_retrievable_bible_record(metadata):
-            continue
-            
+    # [HARD VALIDATION LAYER] Drop entirely malformed or noise-polluted Bible nodes 
+    valid_nodes = [
+        n for n in all_nodes
+        if (metadata := n.node.metadata or {}).get("category") != "bible"
+        or is_retrievable_bible_record(metadata)
+    ]
+    
+    for n in valid_nodes:
         node_key = n.node.get_content()[:200]
         if node_key not in seen_nodes or n.score > seen_nodes[node_key].score:
             seen_nodes[node_key] = n
@@ -229,51 +327,84 @@ def retrieve_context(
     final_nodes = list(seen_nodes.values())
     
     # Sort by score descending
-    final_nodes.sort(key=lambda x: x.score if hasattr(x, 'score') else 0.0, reverse=True)
+    final_nodes.sort(key=lambda x: x.score or 0.0, reverse=True)
     
     # Return top_k across all collections
-    return final_nodes[:top_k]
+    final_nodes = final_nodes[:top_k]
+    if use_cache:
+        retrieval_cache.set(cache_namespace, query_vector, final_nodes)
+    return final_nodes
+
+
 
+# Evidence block layout, formatted with str.format_map; keys missing from the
+# metadata fall back to BIBLE_EVIDENCE_DEFAULTS, then to an empty string
+BIBLE_EVIDENCE_TEMPLATE = (
+    "[BIBLE_RECORD]\n"
+    "book={book}\n"
+    "chapter_num={chapter_num}\n"
+    "verse_num={verse_num}\n"
+    "verse_ref={verse_ref}\n"
+    "reference_display={reference_display}\n"
+    "ga_version_name={ga_version_name}\n"
+    "ga_version_abbr={ga_version_abbr}\n"
+    "english_version_name={english_version_name}\n"
+    "english_version_abbr={english_version_abbr}\n"
+    "ga={ga}\n"
+    "en={en}\n"
+    "source_name={source_name}\n"
+    "ga_text_missing={ga_text_missing}\n"
+    "english_text_missing={english_text_missing}\n"
+    "[/BIBLE_RECORD]\n"
+)
+BIBLE_EVIDENCE_DEFAULTS = {
+    "ga_version_name": "Ŋmalɛ Krɔŋkrɔŋ Lɛ",
+    "ga_version_abbr": "NEGAB",
+    "english_version_name": "King James Version",
+    "english_version_abbr": "KJV",
+}
+
+
+class _EvidenceFields(dict):
+    def __missing__(self, key: str) -> str:
+        return ""
 
 
 def _format_bible_evidence(metadata: dict) -> str:
-    return (
-        "[BIBLE_RECORD]\n"
-        f"book={metadata.get('book', '')}\n"
-        f"chapter_num={metadata.get('chapter_num', '')}\n"
-        f"verse_num={metadata.get('verse_num', '')}\n"
-        f"verse_ref={metadata.get('verse_ref', '')}\n"
-        f"reference_display={metadata.get('reference_display', '')}\n"
-        f"ga_version_name={metadata.get('ga_version_name', 'Ŋmalɛ Krɔŋkrɔŋ Lɛ')}\n"
-        f"ga_version_abbr={metadata.get('ga_version_abbr', 'NEGAB')}\n"
-        f"english_version_name={metadata.get('english_version_name', 'King James Version')}\n"
-        f"english_version_abbr={metadata.get('english_version_abbr', 'KJV')}\n"
-        f"ga={metadata.get('ga', '').strip()}\n"
-        f"en={metadata.get('en', '').strip()}\n"
-        f"source_name={metadata.get('source_name', '')}\n"
-        f"ga_text_missing={metadata.get('ga_text_missing', '')}\n"
-        f"english_text_missing={metadata.get('english_text_missing', '')}\n"
-        "[/BIBLE_RECORD]\n"
-    )
+    fields = _EvidenceFields(BIBLE_EVIDENCE_DEFAULTS)
+    fields.update(metadata)
+    fields["ga"] = fields["ga"].strip()
+    fields["en"] = fields["en"].strip()
+    return BIBLE_EVIDENCE_TEMPLATE.format_map(fields)
 
 def format_retrieved_context(nodes: List[NodeWithScore]) -> str:
     """
     Format retrieved nodes into a context string.
     Prioritizes structured evidence for Bible queries to prevent Formatting Drift.
+    Identical result sets (same nodes and scores) reuse the previously formatted string.
     """
+    if not nodes:
+        return ""
+    
+    cache_key = tuple((n.node.node_id, n.score) for n in nodes)
+    with formatted_context_cache_lock:
+        cached = formatted_context_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     context_parts = []
     
     for i, node in enumerate(nodes, 1):
         # Extract metadata
-        metadata = node.node.metadata if hasattr(node.node, 'metadata') else {}
+        metadata = node.node.metadata
         
         # STRICT BIBLE FORMAT: Provide raw machine-readable arrays, never presentation text
         if metadata.get("category") == "bible":
             context_parts.append(_format_bible_evidence(metadata))
             continue
             
-        text = node.node.text if hasattr(node.node, 'text') else str(node.node)
-        score = node.score if hasattr(node, 'score') else 0.0
+        text = node.node.get_content()
+        score = node.score or 0.0
         full_filename = metadata.get('filename') or metadata.get('file_path') or "Generic Heritage Archive"
         
         # Clean up path
@@ -285,15 +416,13 @@ def format_retrieved_context(nodes: List[NodeWithScore]) -> str:
         if "." in display_name:
             display_name = ".".join(display_name.split(".")[:-1])
             
-        import re
-        display_name = re.sub(r'_\d{8}_\d{6}', '', display_name)
+        display_name = TIMESTAMP_SUFFIX_RE.sub('', display_name)
         source_citation = display_name.replace('_', ' ').strip()
         
         # --- JSONL Phrase Parser ---
         # If the source is a phrases/data file stored as JSONL blobs, extract readable pairs
         formatted_text = text
         if "phrase" in full_filename.lower() or full_filename.lower().endswith(".jsonl"):
-            import json
             pairs = []
             for line in text.splitlines():
                 line = line.strip()
@@ -303,12 +432,12 @@ def format_retrieved_context(nodes: List[NodeWithScore]) -> str:
                 if line.startswith(","):
                     line = line[1:].strip()
                 try:
-                    record = json.loads(line)
+                    record = orjson.loads(line)
                     eng = record.get("english", "").strip()
                     ga = record.get("ga", "").strip()
                     if eng and ga:
                         pairs.append(f"English: {eng} → Ga: {ga}")
-                except (json.JSONDecodeError, ValueError):
+                except (orjson.JSONDecodeError, ValueError):
                     # Not parseable JSON — include as-is if it contains useful text
                     if "→" in line or ("english" in line.lower() and "ga" in line.lower()):
                         pairs.append(line)
@@ -317,7 +446,10 @@ def format_retrieved_context(nodes: List[NodeWithScore]) -> str:
         
         context_parts.append(f"[Source: {source_citation} | Score: {score:.3f}]\n{formatted_text}\n")
     
-    return "\n".join(context_parts)
+    formatted = "\n".join(context_parts)
+    with formatted_context_cache_lock:
+        formatted_context_cache[cache_key] = formatted
+    return formatted
 
 
 
@@ -4,15 +4,19 @@ Handles collection creation and vector store initialization.
 """
 
 import logging
+import threading
 from functools import lru_cache
 from typing import Optional
 from llama_index.vector_stores.qdrant import QdrantVectorStore
 from llama_index.core import VectorStoreIndex
 from qdrant_client import QdrantClient, AsyncQdrantClient
-from qdrant_client.models import Distance, VectorParams
+from qdrant_client.models import (
+    Distance, VectorParams, ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    HnswConfigDiff, OptimizersConfigDiff
+)
 
 from app.core.config import settings
-from app.rag.embeddings import get_embeddings
+from app.rag.embeddings import EMBEDDING_DIM, get_embeddings
 from app.rag.constants import COLLECTION_NAME
 from app.core.resilience import retry_db
 
@@ -21,6 +25,29 @@ logger = logging.getLogger(__name__)
 # Module-level cache for VectorStoreIndex instances to avoid recreating on every retrieval
 _index_cache: dict[str, VectorStoreIndex] = {}
 
+# One QdrantVectorStore per collection, built on first use
+_vector_store_cache: dict[str, QdrantVectorStore] = {}
+_vector_store_lock = threading.Lock()
+
+# Collections known to exist; once created they don't disappear in normal operation,
+# so positive checks are remembered to keep Qdrant off the chat request path
+_ready_collections: set[str] = set()
+
+
+def _qdrant_client_kwargs() -> dict:
+    """Connection settings shared by the sync and async Qdrant clients."""
+    kwargs = {
+        "url": settings.qdrant_url,
+        "timeout": 60,
+        "prefer_grpc": settings.qdrant_prefer_grpc,
+        "grpc_port": settings.qdrant_grpc_port,
+        "pool_size": settings.qdrant_pool_size
+    }
+    # For Qdrant Cloud, API key is required
+    if settings.qdrant_api_key:
+        kwargs["api_key"] = settings.qdrant_api_key
+    return kwargs
+
 
 @lru_cache()
 def get_qdrant_client() -> QdrantClient:
@@ -31,15 +58,7 @@ def get_qdrant_client() -> QdrantClient:
     Returns:
         QdrantClient: Qdrant client
     """
-    # For Qdrant Cloud, API key is required
-    if settings.qdrant_api_key:
-        return QdrantClient(
-            url=settings.qdrant_url,
-            api_key=settings.qdrant_api_key,
-            timeout=60,
-            prefer_grpc=True
-        )
-    return QdrantClient(url=settings.qdrant_url, timeout=60, prefer_grpc=True)
+    return QdrantClient(**_qdrant_client_kwargs())
 
 
 @lru_cache()
@@ -50,19 +69,14 @@ def get_async_qdrant_client() -> AsyncQdrantClient:
     Returns:
         AsyncQdrantClient: Async Qdrant client
     """
-    if settings.qdrant_api_key:
-        return AsyncQdrantClient(
-            url=settings.qdrant_url,
-            api_key=settings.qdrant_api_key,
-            timeout=60
-        )
-    return AsyncQdrantClient(url=settings.qdrant_url, timeout=60)
+    return AsyncQdrantClient(**_qdrant_client_kwargs())
 
 
-@retry_db
 def get_vector_store(collection_name: str = COLLECTION_NAME) -> QdrantVectorStore:
     """
     Get or create Qdrant vector store.
+    The connectivity check and collection setup run once per collection;
+    later calls return the cached store without touching Qdrant.
     
     Args:
         collection_name: Name of the Qdrant collection
@@ -73,41 +87,40 @@ def get_vector_store(collection_name: str = COLLECTION_NAME) -> QdrantVectorStor
     Raises:
         ConnectionError: If Qdrant is not available
     """
+    vector_store = _vector_store_cache.get(collection_name)
+    if vector_store is not None:
+        return vector_store
+    
+    with _vector_store_lock:
+        if collection_name not in _vector_store_cache:
+            _vector_store_cache[collection_name] = _create_vector_store(collection_name)
+        return _vector_store_cache[collection_name]
+
+
+@retry_db
+def _create_vector_store(collection_name: str) -> QdrantVectorStore:
+    """Verify connectivity, ensure the collection and its payload indexes exist, and build the store."""
     client = get_qdrant_client()
     
-    # Try to connect to verify Qdrant is running
+    # One lightweight call both verifies Qdrant is running and tells us whether the collection exists
     try:
-        client.get_collections()
+        exists = client.collection_exists(collection_name)
     except Exception as e:
         error_msg = f"Failed to connect to Qdrant at {settings.qdrant_url}."
         if settings.qdrant_api_key:
             error_msg += " For Qdrant Cloud, please verify your API key is correct."
         else:
-            error_msg += " For local Qdrant, ensure it's running: docker run -p 6333:6333 qdrant/qdrant"
+            error_msg += " For local Qdrant, ensure it's running: docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant"
         error_msg += f" Error: {str(e)}"
         raise ConnectionError(error_msg) from e
     
-    # Get embedding dimension (all-MiniLM-L6-v2 has 384 dimensions)
-    embeddings = get_embeddings()
-    try:
-        embedding_dim = embeddings.get_query_embedding_dimension()
-    except (AttributeError, NotImplementedError):
-        # Fallback to known dimension for all-MiniLM-L6-v2
-        embedding_dim = 384
+    # Known up front for the configured model; creating the collection doesn't need the model loaded
+    embedding_dim = EMBEDDING_DIM
     
-    # Check if collection exists, create if not
+    # Create the collection if the check above didn't find it
     try:
-        collections = client.get_collections()
-        collection_exists = any(col.name == collection_name for col in collections.collections)
-        
-        if not collection_exists:
-            client.create_collection(
-                collection_name=collection_name,
-                vectors_config=VectorParams(
-                    size=embedding_dim,
-                    distance=Distance.COSINE
-                )
-            )
+        if not exists:
+            _create_collection(client, collection_name, embedding_dim)
             
         # Ensure payload indexes exist (for both new and existing collections)
         _ensure_payload_indexes(client, collection_name)
@@ -119,13 +132,7 @@ def get_vector_store(collection_name: str = COLLECTION_NAME) -> QdrantVectorStor
         else:
             # Re-try creation just in case it was a transient fetch error
             try:
-                client.create_collection(
-                    collection_name=collection_name,
-                    vectors_config=VectorParams(
-                        size=embedding_dim,
-                        distance=Distance.COSINE
-                    )
-                )
+                _create_collection(client, collection_name, embedding_dim)
                 _ensure_payload_indexes(client, collection_name)
             except Exception as create_error:
                 if "already exists" in str(create_error).lower():
@@ -136,6 +143,7 @@ def get_vector_store(collection_name: str = COLLECTION_NAME) -> QdrantVectorStor
                         error_msg += " Please verify your Qdrant Cloud API key has the necessary permissions."
                     raise ConnectionError(error_msg) from create_error
 
+    mark_collection_ready(collection_name)
     
     return QdrantVectorStore(
         client=client,
@@ -144,35 +152,62 @@ def get_vector_store(collection_name: str = COLLECTION_NAME) -> QdrantVectorStor
     )
 
 
+def _create_collection(client: QdrantClient, collection_name: str, embedding_dim: int) -> None:
+    """
+    Create a collection tuned for search throughput: int8 scalar-quantized vectors kept in RAM
+    (original vectors are still stored for rescoring), a denser HNSW graph, and fewer, larger segments.
+    """
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(
+            size=embedding_dim,
+            distance=Distance.COSINE,
+            on_disk=False
+        ),
+        quantization_config=ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True
+            )
+        ),
+        hnsw_config=HnswConfigDiff(m=32, ef_construct=256),
+        optimizers_config=OptimizersConfigDiff(default_segment_number=2)
+    )
+
+
 def _ensure_payload_indexes(client: QdrantClient, collection_name: str):
-    """Ensure required metadata indexes exist for fast filtering and deletion."""
+    """
+    Ensure required metadata indexes exist for fast filtering and deletion.
+    Only fields missing from the collection's payload schema are created.
+    """
     from qdrant_client.models import PayloadSchemaType
     
-    # Keyword fields for exact matching
+    # Keyword fields for exact matching (file_path/filename back is_document_indexed and deletes)
     keyword_fields = ["file_path", "filename", "category", "book", "chapter", "verse"]
     
     # Integer fields for range matching (if needed)
     integer_fields = ["chapter_num", "verse_num"]
     
-    for field in keyword_fields:
-        try:
-            client.create_payload_index(
-                collection_name=collection_name,
-                field_name=field,
-                field_schema=PayloadSchemaType.KEYWORD
-            )
-        except Exception:
-            pass
-            
-    for field in integer_fields:
+    try:
+        existing = set(client.get_collection(collection_name).payload_schema or {})
+    except Exception:
+        existing = set()
+    
+    wanted = [(field, PayloadSchemaType.KEYWORD) for field in keyword_fields]
+    wanted += [(field, PayloadSchemaType.INTEGER) for field in integer_fields]
+    
+    for field, schema in wanted:
+        if field in existing:
+            continue
         try:
             client.create_payload_index(
                 collection_name=collection_name,
                 field_name=field,
-                field_schema=PayloadSchemaType.INTEGER
+                field_schema=schema
             )
-        except Exception:
-            pass
+        except Exception as e:
+            logger.warning(f"Could not create payload index '{field}' on '{collection_name}': {e}")
 
 
 def collection_exists(collection_name: str = COLLECTION_NAME) -> bool:
@@ -182,16 +217,62 @@ def collection_exists(collection_name: str = COLLECTION_NAME) -> bool:
     Args:
         collection_name: Name of the collection to check
 
+    Positive results are cached for the life of the process; negatives are re-checked.
+
     Returns:
         bool: True if collection exists, False otherwise
     """
+    if collection_name in _ready_collections:
+        return True
     try:
-        client = get_qdrant_client()
-        collections = client.get_collections()
-        return any(col.name == collection_name for col in collections.collections)
+        exists = get_qdrant_client().collection_exists(collection_name)
     except Exception:
         # Qdrant not available or connection failed
         return False
+    if exists:
+        mark_collection_ready(collection_name)
+    return exists
+
+
+async def acollection_exists(collection_name: str = COLLECTION_NAME) -> bool:
+    """
+    Async variant of collection_exists for use on the event loop.
+    Shares the same positive-result cache.
+
+    Args:
+        collection_name: Name of the collection to check
+
+    Returns:
+        bool: True if collection exists, False otherwise
+    """
+    if collection_name in _ready_collections:
+        return True
+    try:
+        exists = await get_async_qdrant_client().collection_exists(collection_name)
+    except Exception:
+        # Qdrant not available or connection failed
+        return False
+    if exists:
+        mark_collection_ready(collection_name)
+    return exists
+
+
+def mark_collection_ready(collection_name: str = COLLECTION_NAME) -> None:
+    """Record that a collection is known to exist."""
+    _ready_collections.add(collection_name)
+
+
+def invalidate_collection_ready(collection_name: str | None = None) -> None:
+    """
+    Forget cached existence for a collection (e.g. after it is dropped).
+
+    Args:
+        collection_name: If provided, forget only this collection. Otherwise forget all.
+    """
+    if collection_name:
+        _ready_collections.discard(collection_name)
+    else:
+        _ready_collections.clear()
 
 
 def get_index(collection_name: str = COLLECTION_NAME) -> VectorStoreIndex:
@@ -4,14 +4,30 @@ Humanized responses for better user experience.
 """
 
 from datetime import datetime
-from typing import Any
-from pydantic import BaseModel, Field
+from typing import Any, Literal
+from pydantic import BaseModel, ConfigDict, Field
+
+# Fixed vocabularies, validated as literals rather than free-form strings
+MessageRole = Literal["user", "assistant", "system"]
+UserRole = Literal["admin", "moderator", "user", "member"]
+UploadStatus = Literal["success", "processing", "failed"]
+HealthStatus = Literal["healthy", "degraded"]
+
+
+class ResponseModel(BaseModel):
+    """
+    Base for response schemas.
+    Responses are built once and serialized, never mutated, so instances are frozen
+    and unknown keys from repository rows are dropped instead of stored.
+    """
+    
+    model_config = ConfigDict(frozen=True, extra="ignore")
 
 
-class UploadResponse(BaseModel):
+class UploadResponse(ResponseModel):
     """Response schema for /upload endpoint with humanized messages."""
     
-    status: str = Field(..., description="Upload status (e.g., 'success', 'processing')")
+    status: UploadStatus = Field(..., description="Upload status ('success', 'processing' or 'failed')")
     file_name: str = Field(..., description="Name of the uploaded file")
     file_size: str | None = Field(None, description="Human-readable file size (e.g., '2.5 MB')")
     message: str = Field(..., description="Friendly status message for the user")
@@ -19,7 +35,7 @@ class UploadResponse(BaseModel):
     next_step: str | None = Field(None, description="Suggested next action (e.g., 'You can now ask questions about this document')")
 
 
-class AskResponse(BaseModel):
+class AskResponse(ResponseModel):
     """Response schema for /ask endpoint (non-streaming) with humanized format."""
     
     conversation_id: str = Field(..., description="Your conversation ID - save this to continue chatting")
@@ -28,18 +44,18 @@ class AskResponse(BaseModel):
     timestamp: str = Field(..., description="When this response was generated (human-readable format)")
 
 
-class MessageResponse(BaseModel):
+class MessageResponse(ResponseModel):
     """Response schema for a message with humanized timestamps."""
     
     id: str = Field(..., description="Unique message identifier")
     conversation_id: str = Field(..., description="Conversation this message belongs to")
-    role: str = Field(..., description="Who sent this: 'you' (user) or 'assistant'")
+    role: MessageRole = Field(..., description="Who sent this: 'user', 'assistant' or 'system'")
     content: str = Field(..., description="The message content")
     sent_at: str = Field(..., description="When this message was sent (e.g., '2 minutes ago', 'Today at 3:45 PM')")
     created_at: datetime = Field(..., description="Raw timestamp for sorting")
 
 
-class ConversationResponse(BaseModel):
+class ConversationResponse(ResponseModel):
     """Response schema for conversation messages with humanized format."""
     
     conversation_id: str = Field(..., description="Your conversation ID")
@@ -49,16 +65,16 @@ class ConversationResponse(BaseModel):
     last_activity: str | None = Field(None, description="Last activity time (e.g., 'Active 5 minutes ago')")
 
 
-class HealthResponse(BaseModel):
+class HealthResponse(ResponseModel):
     """Response schema for /health endpoint with friendly status."""
     
-    status: str = Field(..., description="Service status (e.g., 'All systems operational')")
+    status: HealthStatus = Field(..., description="Service status: 'healthy', or 'degraded' if a dependency is down")
     message: str = Field(default="Service is running smoothly", description="Friendly status message")
     timestamp: str = Field(..., description="Current time (human-readable format)")
     uptime: str | None = Field(None, description="How long the service has been running")
 
 
-class APIInfoResponse(BaseModel):
+class APIInfoResponse(ResponseModel):
     """Response schema for root endpoint with helpful information."""
     
     message: str = Field(..., description="Welcome message for the API")
@@ -67,7 +83,7 @@ class APIInfoResponse(BaseModel):
     version: str | None = Field(None, description="API version")
 
 
-class ConversationListItem(BaseModel):
+class ConversationListItem(ResponseModel):
     """Response schema for a conversation list item with humanized format."""
     
     conversation_id: str = Field(..., description="Your conversation ID")
@@ -77,7 +93,7 @@ class ConversationListItem(BaseModel):
     message_count: str | None = Field(None, description="Number of messages (e.g., '12 messages')")
 
 
-class ConversationsListResponse(BaseModel):
+class ConversationsListResponse(ResponseModel):
     """Response schema for conversations list with humanized format."""
     
     conversations: list[ConversationListItem] = Field(..., description="Your conversations")
@@ -85,7 +101,7 @@ class ConversationsListResponse(BaseModel):
     summary: str | None = Field(None, description="Summary message (e.g., 'You have 5 active conversations')")
 
 
-class DocumentListItem(BaseModel):
+class DocumentListItem(ResponseModel):
     """Response schema for a single document list item."""
     id: str = Field(..., description="The document ID (MongoDB)")
     original_filename: str = Field(..., description="The name of the originally uploaded file")
@@ -93,29 +109,29 @@ class DocumentListItem(BaseModel):
     status: str = Field(..., description="Processing status (e.g., 'indexed')")
     uploaded_at: str = Field(..., description="When the file was uploaded (human-readable)")
 
-class DocumentListResponse(BaseModel):
+class DocumentListResponse(ResponseModel):
     """Response schema for a list of all documents."""
     documents: list[DocumentListItem] = Field(..., description="List of documents")
     total: int = Field(..., description="Total number of documents")
 
-class UserListItem(BaseModel):
+class UserListItem(ResponseModel):
     """Response schema for a single user in the management list."""
     id: str = Field(..., description="The user's unique ID (MongoDB)")
     email: str = Field(..., description="The user's email address")
-    role: str = Field(..., description="The user's current role (e.g., 'admin', 'moderator', 'user')")
+    role: UserRole = Field(..., description="The user's current role ('admin', 'moderator', 'user' or 'member')")
     display_name: str | None = Field(None, description="User's display name")
     first_name: str | None = Field(None, description="User's first name")
     last_name: str | None = Field(None, description="User's last name")
     dob: str | None = Field(None, description="User's date of birth")
     created_at: str = Field(..., description="When the user joined (human-readable)")
 
-class UserListResponse(BaseModel):
+class UserListResponse(ResponseModel):
     """Response schema for a list of users."""
     users: list[UserListItem] = Field(..., description="List of registered users")
     total: int = Field(..., description="Total number of registered users")
 
 
-class SystemStatsResponse(BaseModel):
+class SystemStatsResponse(ResponseModel):
     """Response schema for global system statistics in the admin dashboard."""
     total_documents: int = Field(..., description="Total number of indexed documents")
     registered_users: int = Field(..., description="Total number of registered users (from profiles)")
@@ -126,7 +142,7 @@ class SystemStatsResponse(BaseModel):
     timestamp: str = Field(..., description="UTC timestamp of the stats report")
 
 
-class RefinementPreviewResponse(BaseModel):
+class RefinementPreviewResponse(ResponseModel):
     """Response schema for the /refine/preview endpoint."""
     raw_text: str = Field(..., description="Extracted raw text (truncated for preview)")
     refined_records: list[dict] = Field(..., description="List of 16-field verse records")
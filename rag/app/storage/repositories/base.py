@@ -1,5 +1,5 @@
 from typing import Generic, TypeVar, List, Optional, Any, Dict
-from pymongo import AsyncMongoClient
+from pymongo import AsyncMongoClient, ReturnDocument
 from pymongo.errors import PyMongoError
 
 
@@ -56,17 +56,13 @@ class BaseRepository(Generic[T]):
         Update a record by ID.
         """
         try:
-            result = await self.collection.find_one_and_update(
+            # The updated document comes back from the write itself; no follow-up read
+            return await self.collection.find_one_and_update(
                 {"id": id},
                 {"$set": data},
                 projection={"_id": 0},
-                return_document=True # Note: this might need Import from pymongo if Enum used
+                return_document=ReturnDocument.AFTER
             )
-            # In PyMongo 4.9+, find_one_and_update with ReturnDocument.AFTER 
-            # (which is what we want) usually needs the Enum.
-            # Simplified for now:
-            updated = await self.collection.find_one({"id": id}, {"_id": 0})
-            return updated
         except PyMongoError:
             return None
 
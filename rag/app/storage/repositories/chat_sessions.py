@@ -1,7 +1,12 @@
+import logging
 from typing import Optional, Dict, Any, List
-from pymongo import AsyncMongoClient, DESCENDING
+from pymongo import AsyncMongoClient, ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import PyMongoError
+from app.core.cache import conversation_owner_cache
 from .base import BaseRepository
 
+logger = logging.getLogger(__name__)
+
 class ChatSessionRepository(BaseRepository):
     """
     Repository for interacting with the chat_sessions collection in MongoDB.
@@ -9,12 +14,24 @@ class ChatSessionRepository(BaseRepository):
     def __init__(self, client: AsyncMongoClient, db_name: str):
         super().__init__(client, db_name, "chat_sessions")
 
+    async def ensure_query_indexes(self):
+        """
+        Ensure indexes for session lookups by id (and owner) and recent-session listings per user.
+        """
+        try:
+            await self.collection.create_index([("id", ASCENDING), ("user_id", ASCENDING)])
+            await self.collection.create_index([("user_id", ASCENDING), ("updated_at", DESCENDING)])
+        except Exception as e:
+            logger.warning(f"Failed to create chat session indexes: {e}")
+
     async def get_recent_sessions(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """
         Retrieves recent sessions for a specific user, ordered by updated_at.
+        Sorting, limiting and trimming happen in MongoDB; the (possibly long) summary
+        and metadata aren't needed for listings and stay on the server.
         """
         cursor = (
-            self.collection.find({"user_id": user_id}, {"_id": 0})
+            self.collection.find({"user_id": user_id}, {"_id": 0, "summary": 0, "metadata": 0})
             .sort("updated_at", DESCENDING)
             .limit(limit)
         )
@@ -38,7 +55,10 @@ class ChatSessionRepository(BaseRepository):
             "updated_at": now,
             "metadata": {}
         }
-        return await self.create(data)
+        session = await self.create(data)
+        if session:
+            conversation_owner_cache[(session_id, user_id)] = True
+        return session
 
     async def get_or_create(self, session_id: str, user_id: str) -> Dict[str, Any]:
         """
@@ -60,6 +80,29 @@ class ChatSessionRepository(BaseRepository):
         """
         return await self.collection.find_one({"id": session_id, "user_id": user_id}, {"_id": 0})
 
+    async def get_meta(self, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve just the title and summary of a session owned by the user, in one query.
+        """
+        return await self.collection.find_one(
+            {"id": session_id, "user_id": user_id},
+            {"_id": 0, "title": 1, "summary": 1}
+        )
+
+    async def is_owned_by(self, session_id: str, user_id: str) -> bool:
+        """
+        Check that a session exists and belongs to the user.
+        Positive answers are cached so ongoing chats skip the lookup.
+        """
+        key = (session_id, user_id)
+        if key in conversation_owner_cache:
+            return True
+        
+        session = await self.collection.find_one({"id": session_id, "user_id": user_id}, {"_id": 0, "id": 1})
+        if session:
+            conversation_owner_cache[key] = True
+        return session is not None
+
     async def update_title(self, session_id: str, title: str) -> Optional[Dict[str, Any]]:
         """Update session title."""
         from datetime import datetime, timezone
@@ -76,6 +119,37 @@ class ChatSessionRepository(BaseRepository):
             "updated_at": datetime.now(timezone.utc).isoformat()
         })
 
+    async def update_title_and_summary(self, session_id: str, title: Optional[str], summary: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Update session title and summary in a single write, skipping fields that are None."""
+        from datetime import datetime, timezone
+        data: Dict[str, Any] = {"updated_at": datetime.now(timezone.utc).isoformat()}
+        if title:
+            data["title"] = title
+        if summary:
+            data["summary"] = summary
+        return await self.update(session_id, data)
+
+    async def record_turn(self, session_id: str) -> int:
+        """
+        Increment the session's turn counter and refresh updated_at in one write.
+        Returns the new turn count (0 if the session is missing or the write failed).
+        """
+        from datetime import datetime, timezone
+        try:
+            session = await self.collection.find_one_and_update(
+                {"id": session_id},
+                {
+                    "$inc": {"turn_count": 1},
+                    "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}
+                },
+                projection={"_id": 0, "turn_count": 1},
+                return_document=ReturnDocument.AFTER
+            )
+        except PyMongoError as e:
+            logger.error(f"Failed to record turn for session {session_id}: {e}")
+            return 0
+        return session.get("turn_count", 0) if session else 0
+
     async def update_activity(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Refresh the updated_at timestamp."""
         from datetime import datetime, timezone
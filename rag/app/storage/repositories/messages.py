@@ -1,6 +1,6 @@
 import logging
 from typing import List, Dict, Any, Optional
-from pymongo import AsyncMongoClient, ASCENDING
+from pymongo import AsyncMongoClient, ASCENDING, DESCENDING
 from .base import BaseRepository
 
 logger = logging.getLogger(__name__)
@@ -33,19 +33,54 @@ class MessageRepository(BaseRepository):
         except Exception as e:
             logger.warning(f"Failed to create TTL index: {e}")
 
-    async def get_by_conversation(self, conversation_id: str, user_id: str = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    async def ensure_query_indexes(self):
+        """
+        Ensure the compound (conversation_id, created_at) index on both interaction collections,
+        so per-conversation reads and first-query previews are index scans returned already sorted.
+        """
+        for collection in (self.collection, self.guest_collection):
+            try:
+                await collection.create_index([("conversation_id", ASCENDING), ("created_at", ASCENDING)])
+            except Exception as e:
+                logger.warning(f"Failed to create conversation index on {collection.name}: {e}")
+
+    async def get_by_conversation(self, conversation_id: str, user_id: str = None, limit: Optional[int] = None, tail: bool = False) -> List[Dict[str, Any]]:
         """
         Retrieves all interactions for a specific conversation, ordered by creation time.
+        With `tail=True` and a limit, the newest `limit` interactions are fetched instead
+        of the oldest (still returned in chronological order).
         """
         query = {"conversation_id": conversation_id}
         collection = self._get_collection(user_id)
         
-        cursor = collection.find(query, {"_id": 0}).sort("created_at", ASCENDING)
+        newest_first = tail and bool(limit)
+        cursor = collection.find(query, {"_id": 0}).sort("created_at", DESCENDING if newest_first else ASCENDING)
         
         if limit:
             cursor = cursor.limit(limit)
             
-        return await cursor.to_list(length=limit or 1000)
+        interactions = await cursor.to_list(length=limit or 1000)
+        if newest_first:
+            interactions.reverse()
+        return interactions
+
+    async def get_first_queries(self, conversation_ids: List[str], user_id: str = None) -> Dict[str, str]:
+        """
+        Retrieves the opening query of each conversation in a single aggregation.
+        Returns a mapping of conversation_id -> query for conversations that have turns.
+        """
+        if not conversation_ids:
+            return {}
+        
+        collection = self._get_collection(user_id)
+        pipeline = [
+            {"$match": {"conversation_id": {"$in": conversation_ids}}},
+            {"$sort": {"created_at": ASCENDING}},
+            {"$group": {"_id": "$conversation_id", "query": {"$first": "$query"}}}
+        ]
+        cursor = await collection.aggregate(pipeline)
+        rows = await cursor.to_list(length=len(conversation_ids))
+        return {row["_id"]: row.get("query") or "" for row in rows}
 
     async def delete_by_conversation(self, conversation_id: str, user_id: str = None) -> bool:
         """
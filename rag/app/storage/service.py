@@ -2,6 +2,9 @@ from typing import List, Optional
 from fastapi import UploadFile
 from app.core.config import settings
 from app.storage.supabase_client import get_supabase
+from app.storage.supabase import get_public_url
+from app.core.cache import storage_exists_cache
+from app.core.resilience import retry_storage
 
 class StorageService:
     """
@@ -9,6 +12,7 @@ class StorageService:
     """
     
     @staticmethod
+    @retry_storage
     async def upload_file(file_content: bytes, storage_path: str, content_type: str = "application/octet-stream") -> str:
         """
         Uploads bytes to the configured Supabase bucket.
@@ -19,8 +23,16 @@ class StorageService:
             file=file_content,
             file_options={"content-type": content_type, "upsert": "true"}
         )
+        storage_exists_cache.pop(storage_path, None)
         # Return the public URL
-        return f"{settings.supabase_url}/storage/v1/object/public/{settings.supabase_bucket}/{storage_path}"
+        return get_public_url(storage_path)
+
+    @staticmethod
+    def get_public_url(storage_path: str) -> str:
+        """
+        Returns the public URL for a file in the bucket.
+        """
+        return get_public_url(storage_path)
 
     @staticmethod
     async def download_file(storage_path: str) -> bytes:
@@ -31,9 +43,11 @@ class StorageService:
         return await client.storage.from_(settings.supabase_bucket).download(storage_path)
 
     @staticmethod
+    @retry_storage
     async def delete_file(storage_path: str):
         """
         Deletes a file from the bucket.
         """
         client = await get_supabase()
         await client.storage.from_(settings.supabase_bucket).remove([storage_path])
+        storage_exists_cache.pop(storage_path, None)
@@ -4,9 +4,62 @@ This module now handles ONLY binary storage (S3-compatible) operations.
 All database operations have been migrated to MongoDB.
 """
 
+import asyncio
+import logging
+import os
+import tempfile
+from pathlib import Path
 from typing import List, Optional
+import httpx
 from fastapi import UploadFile
+from storage3.exceptions import StorageApiError
+from tenacity import AsyncRetrying
+from app.core.config import settings
 from app.storage.supabase_client import get_supabase
+from app.core.cache import storage_exists_cache
+from app.core.http import get_http_client
+from app.core.resilience import STORAGE_RETRY_POLICY, retry_storage
+
+logger = logging.getLogger(__name__)
+
+# Read uploads in 1 MiB chunks so large archives never sit fully in memory
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Objects per storage listing request (the API defaults to 100 when no limit is given)
+STORAGE_LIST_PAGE_SIZE = 1000
+
+# Public object URLs only differ by path, so the prefix is built once
+PUBLIC_URL_PREFIX = f"{settings.supabase_url}/storage/v1/object/public/{settings.supabase_bucket}/"
+
+# Existence/size probes are cheap HEAD requests; don't let them hang on the shared client's long timeout
+PROBE_TIMEOUT = 10.0
+
+
+def get_public_url(storage_path: str) -> str:
+    """
+    Build the public URL of an object in the storage bucket.
+    """
+    return PUBLIC_URL_PREFIX + storage_path
+
+
+async def get_storage_file_size(storage_path: str) -> Optional[int]:
+    """
+    Get the size of a stored file with a HEAD request on its public URL.
+    
+    Args:
+        storage_path: Path in storage bucket
+        
+    Returns:
+        Optional[int]: Size in bytes, or None if the file does not exist
+    
+    Raises:
+        httpx.HTTPError: If the probe itself fails (network error, unexpected status)
+    """
+    response = await get_http_client().head(get_public_url(storage_path), timeout=PROBE_TIMEOUT)
+    if response.status_code in (400, 404):
+        return None
+    response.raise_for_status()
+    return int(response.headers.get("content-length", 0))
 
 async def upload_document(file: UploadFile, storage_path: str, overwrite: bool = False) -> str:
     """
@@ -19,25 +72,96 @@ async def upload_document(file: UploadFile, storage_path: str, overwrite: bool =
         
     Returns:
         str: Public URL to the uploaded file
+    
+    Raises:
+        ValueError: If the file already exists and overwrite is False
+    """
+    # Stream through a temp file rather than reading the whole upload into memory;
+    # the storage client only accepts real file handles (not SpooledTemporaryFile)
+    public_url, _ = await upload_document_streaming(file, storage_path, overwrite=overwrite)
+    return public_url
+
+
+async def upload_document_streaming(file: UploadFile, storage_path: str, overwrite: bool = False) -> tuple[str, int]:
+    """
+    Upload a document to Supabase Storage without buffering it in memory.
+    
+    The upload is spooled to a temporary file in fixed-size chunks and the
+    open file handle is handed to the storage client, which streams it.
+    
+    Args:
+        file: FastAPI UploadFile object
+        storage_path: Path in storage bucket
+        overwrite: Whether to overwrite existing file
+        
+    Returns:
+        tuple[str, int]: Public URL to the uploaded file and its size in bytes
+    
+    Raises:
+        ValueError: If the file already exists and overwrite is False
     """
     client = await get_supabase()
-    from app.core.config import settings
     
-    # Read file content
-    content = await file.read()
+    file_size = 0
+    tmp = tempfile.NamedTemporaryFile(suffix=Path(storage_path).suffix, delete=False)
+    try:
+        # One try/finally around spooling and upload: a client disconnect mid-read must not leak the file
+        with tmp:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                await asyncio.to_thread(tmp.write, chunk)
+        
+        try:
+            # No existence pre-check: the upsert flag makes the storage API enforce `overwrite` atomically
+            await _upload_file(client.storage.from_(settings.supabase_bucket), storage_path, tmp.name, overwrite)
+        except StorageApiError as e:
+            if not overwrite and _is_duplicate(e):
+                raise ValueError(f"File already exists in storage: {storage_path}") from e
+            raise
+    finally:
+        os.unlink(tmp.name)
+    storage_exists_cache.pop(storage_path, None)
     
-    # Upload to storage
-    response = await client.storage.from_(settings.supabase_bucket).upload(
-        path=storage_path,
-        file=content,
-        file_options={"upsert": "true" if overwrite else "false"}
-    )
+    public_url = get_public_url(storage_path)
     
-    # Get public URL
-    # response is usually a path string or similar depending on the version of the library
-    public_url = f"{settings.supabase_url}/storage/v1/object/public/{settings.supabase_bucket}/{storage_path}"
+    return public_url, file_size
+
+
+def _is_duplicate(e: StorageApiError) -> bool:
+    """Whether the storage API rejected a create-only upload because the object exists."""
+    return str(e.status) == "409" or e.code == "Duplicate"
+
+
+async def _upload_file(bucket, storage_path: str, local_path: str, overwrite: bool) -> None:
+    """
+    Upload a local file, retrying transient failures and reopening it (and rebuilding the
+    options the client consumes) on each attempt.
     
-    return public_url
+    A create-only upload is not idempotent: if an earlier attempt stored the object but its
+    response was lost, the retry is rejected as a duplicate. On a retry, that counts as
+    success when the stored object has the size of the local file.
+    """
+    async for attempt in AsyncRetrying(**STORAGE_RETRY_POLICY):
+        with attempt:
+            try:
+                with open(local_path, "rb") as handle:
+                    await bucket.upload(
+                        path=storage_path,
+                        file=handle,
+                        file_options={"upsert": "true" if overwrite else "false"}
+                    )
+            except StorageApiError as e:
+                if overwrite or attempt.retry_state.attempt_number == 1 or not _is_duplicate(e):
+                    raise
+                if await get_storage_file_size(storage_path) != os.path.getsize(local_path):
+                    raise
+                logger.info(f"Upload of {storage_path} was stored by an earlier attempt")
+
+
+@retry_storage
+async def _remove_files(bucket, storage_paths: List[str]) -> None:
+    """Remove objects from a bucket, retrying transient failures."""
+    await bucket.remove(storage_paths)
 
 
 async def download_document(storage_path: str) -> bytes:
@@ -52,19 +176,30 @@ async def download_document(storage_path: str) -> bytes:
 async def list_storage_files() -> List[str]:
     """
     List all files in the Supabase Storage bucket.
+    Pages through the listing; a single call is capped by the API's page limit.
     """
     client = await get_supabase()
     from app.core.config import settings
     
-    response = await client.storage.from_(settings.supabase_bucket).list()
-    
-    # Extract file names from response
+    bucket = client.storage.from_(settings.supabase_bucket)
     files = []
-    for item in response:
-        if isinstance(item, dict) and "name" in item:
-            files.append(item["name"])
-        elif hasattr(item, "name"):
-            files.append(item.name)
+    offset = 0
+    while True:
+        response = await bucket.list(
+            path="",
+            options={"limit": STORAGE_LIST_PAGE_SIZE, "offset": offset, "sortBy": {"column": "name", "order": "asc"}}
+        )
+        
+        # Extract file names from response
+        for item in response:
+            if isinstance(item, dict) and "name" in item:
+                files.append(item["name"])
+            elif hasattr(item, "name"):
+                files.append(item.name)
+        
+        if len(response) < STORAGE_LIST_PAGE_SIZE:
+            break
+        offset += STORAGE_LIST_PAGE_SIZE
             
     return files
 
@@ -72,9 +207,20 @@ async def list_storage_files() -> List[str]:
 async def file_exists_in_storage(storage_path: str) -> bool:
     """
     Check if a file exists in Supabase Storage.
+    Results (including misses) are cached briefly to skip repeated bucket listings.
     """
-    files = await list_storage_files()
-    return storage_path in files
+    if storage_path in storage_exists_cache:
+        return storage_exists_cache[storage_path]
+    
+    try:
+        exists = await get_storage_file_size(storage_path) is not None
+    except httpx.HTTPError as e:
+        # Fall back to listing the bucket if the public endpoint can't be probed
+        logger.warning(f"HEAD probe failed for {storage_path}, listing bucket instead: {e}")
+        files = await list_storage_files()
+        exists = storage_path in files
+    storage_exists_cache[storage_path] = exists
+    return exists
 
 
 async def delete_document(storage_path: str) -> bool:
@@ -85,10 +231,9 @@ async def delete_document(storage_path: str) -> bool:
     from app.core.config import settings
     
     try:
-        await client.storage.from_(settings.supabase_bucket).remove([storage_path])
+        await _remove_files(client.storage.from_(settings.supabase_bucket), [storage_path])
+        storage_exists_cache.pop(storage_path, None)
         return True
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Failed to delete {storage_path} from Supabase: {e}")
         return False
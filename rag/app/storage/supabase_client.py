@@ -1,3 +1,4 @@
+import asyncio
 from typing import Optional
 from supabase import AsyncClient
 from app.core.config import settings
@@ -9,24 +10,32 @@ class SupabaseManager:
     This client is now primarily used for Storage (bucket) operations.
     """
     _instance: Optional[AsyncClient] = None
+    # Serializes first-time creation so concurrent callers can't each build (and leak) a client
+    _lock = asyncio.Lock()
 
     @classmethod
     async def get_client(cls) -> AsyncClient:
         """
         Returns the singleton Supabase AsyncClient instance.
-        Initializes it if it doesn't exist.
+        Built eagerly in the app lifespan; initialized here only if that hasn't happened yet.
         """
-        if cls._instance is None:
-            from supabase import AsyncClientOptions
-            options = AsyncClientOptions(
-                storage_client_timeout=120,  # 2 minute timeout for large archival uploads
-                postgrest_client_timeout=60   # 1 minute timeout for general DB operations
-            )
-            cls._instance = await AsyncClient.create(
-                settings.supabase_url,
-                settings.supabase_key,
-                options=options
-            )
+        if cls._instance is not None:
+            return cls._instance
+        
+        async with cls._lock:
+            if cls._instance is None:
+                from supabase import AsyncClientOptions
+                from app.core.http import get_http_client
+                options = AsyncClientOptions(
+                    storage_client_timeout=120,  # 2 minute timeout for large archival uploads
+                    postgrest_client_timeout=60,  # 1 minute timeout for general DB operations
+                    httpx_client=get_http_client()  # Pooled HTTP/2 connections shared with probes and the LLM
+                )
+                cls._instance = await AsyncClient.create(
+                    settings.supabase_url,
+                    settings.supabase_key,
+                    options=options
+                )
         return cls._instance
 
     @classmethod
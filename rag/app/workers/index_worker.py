@@ -1,18 +1,35 @@
 """
 Background indexing worker.
 Periodically checks Supabase Storage for unindexed documents and indexes them.
-Runs every hour by default.
+Runs every hour by default, backing off while idle; a check can also be requested on demand.
+Requested checks run in the process that receives the request, so they work whether or not
+the periodic indexer is running there.
 """
 
 import asyncio
 import logging
-from typing import List
+from typing import List, Optional
 from app.storage.supabase import list_storage_files
-from app.rag.indexer import index_document_from_storage, is_document_indexed
-from app.rag.vector_store import collection_exists
+from app.rag.indexer import index_document_from_storage, is_document_indexed_batch
+from app.rag.vector_store import acollection_exists
 
 logger = logging.getLogger(__name__)
 
+# Storage documents indexed at once per check
+WORKER_INDEX_CONCURRENCY = 8
+
+# Upper bound for the idle polling interval; it doubles after each check that finds nothing
+MAX_INTERVAL_HOURS = 6
+
+# Set by request_index_check(); cleared by the task that runs the requested check
+_index_requested = asyncio.Event()
+
+# Background task serving requested checks (strong reference so it isn't garbage-collected)
+_requested_check_task: Optional[asyncio.Task] = None
+
+# Requested and periodic checks never scan storage at the same time
+_check_lock = asyncio.Lock()
+
 
 async def check_and_index_storage_files() -> int:
     """
@@ -22,7 +39,7 @@ async def check_and_index_storage_files() -> int:
         int: Number of documents indexed
     """
     # Check if Qdrant collection exists
-    if not collection_exists():
+    if not await acollection_exists():
         logger.warning("Qdrant collection does not exist. Skipping indexing check.")
         return 0
     
@@ -38,27 +55,34 @@ async def check_and_index_storage_files() -> int:
         logger.info("No files found in storage")
         return 0
     
-    indexed_count = 0
-    skipped_count = 0
-    error_count = 0
+    # One membership query for the whole listing instead of a round-trip per file
+    try:
+        already_indexed = await is_document_indexed_batch(storage_files)
+    except Exception as e:
+        logger.error(f"Error checking indexed documents: {e}")
+        return 0
     
-    for file_path in storage_files:
-        try:
-            # Check if document is already indexed
-            if await is_document_indexed(file_path):
-                logger.debug(f"Document already indexed: {file_path}")
-                skipped_count += 1
-                continue
-            
-            # Index the document
+    to_index = [file_path for file_path in storage_files if file_path not in already_indexed]
+    skipped_count = len(storage_files) - len(to_index)
+    semaphore = asyncio.Semaphore(WORKER_INDEX_CONCURRENCY)
+    
+    async def _index(file_path: str) -> None:
+        async with semaphore:
             logger.info(f"Indexing document: {file_path}")
             await index_document_from_storage(file_path, metadata={"file_path": file_path, "filename": file_path})
-            indexed_count += 1
             logger.info(f"Successfully indexed: {file_path}")
-            
-        except Exception as e:
-            logger.error(f"Error indexing document {file_path}: {e}")
+    
+    # Files are independent, so index them concurrently; one failure doesn't stop the rest
+    results = await asyncio.gather(*[_index(file_path) for file_path in to_index], return_exceptions=True)
+    
+    indexed_count = 0
+    error_count = 0
+    for file_path, result in zip(to_index, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error indexing document {file_path}: {result}")
             error_count += 1
+        else:
+            indexed_count += 1
     
     logger.info(
         f"Indexing check complete. "
@@ -70,25 +94,61 @@ async def check_and_index_storage_files() -> int:
     return indexed_count
 
 
+async def _locked_check() -> int:
+    """Run one storage check, waiting for any check already in progress to finish first."""
+    async with _check_lock:
+        return await check_and_index_storage_files()
+
+
+async def _run_requested_checks() -> None:
+    """Serve requested checks until no new request arrived during the last one."""
+    while _index_requested.is_set():
+        _index_requested.clear()
+        try:
+            await _locked_check()
+        except Exception as e:
+            logger.error(f"Requested index check failed: {e}")
+
+
+def request_index_check() -> None:
+    """
+    Schedule an immediate storage check in the background (e.g. from a storage upload webhook).
+    Requests made while a check is already running are coalesced into one follow-up check.
+    """
+    global _requested_check_task
+    _index_requested.set()
+    if _requested_check_task is None or _requested_check_task.done():
+        _requested_check_task = asyncio.create_task(_run_requested_checks())
+
+
 async def run_periodic_indexer(interval_hours: int = 1):
     """
-    Run the periodic indexing worker that checks storage every hour.
+    Run the periodic indexing worker.
+    Checks storage every `interval_hours`, doubling the wait (up to MAX_INTERVAL_HOURS)
+    after each check that finds nothing new and resetting it once something is indexed.
+    On-demand checks from request_index_check() run separately and never overlap these.
     
     Args:
-        interval_hours: Hours to wait between checks (default: 1 hour)
+        interval_hours: Hours to wait between checks while documents are arriving (default: 1 hour)
     """
     interval_seconds = interval_hours * 3600
+    max_interval_seconds = max(interval_seconds, MAX_INTERVAL_HOURS * 3600)
     
-    logger.info(f"Periodic indexer started. Checking every {interval_hours} hour(s) ({interval_seconds} seconds)")
+    logger.info(f"Periodic indexer started. Checking every {interval_hours} hour(s) ({interval_seconds} seconds), backing off to {MAX_INTERVAL_HOURS} hours when idle")
     
     # Run immediately on startup
-    await check_and_index_storage_files()
+    indexed = await _locked_check()
+    delay = interval_seconds
     
-    # Then run periodically
+    # Then run periodically with backoff
     while True:
         try:
-            await asyncio.sleep(interval_seconds)
-            await check_and_index_storage_files()
+            if not indexed:
+                delay = min(delay * 2, max_interval_seconds)
+            else:
+                delay = interval_seconds
+            await asyncio.sleep(delay)
+            indexed = await _locked_check()
         except asyncio.CancelledError:
             logger.info("Periodic indexer cancelled")
             break
@@ -96,6 +156,3 @@ async def run_periodic_indexer(interval_hours: int = 1):
             logger.error(f"Periodic indexer error: {e}")
             # Continue running even if there's an error
             await asyncio.sleep(60)  # Wait 1 minute before retrying on error
-
-
-
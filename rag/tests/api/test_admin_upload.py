@@ -0,0 +1,27 @@
+import pytest
+from io import BytesIO
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.api.deps import get_current_admin
+
+
+@pytest.fixture
+def as_admin(test_app):
+    test_app.dependency_overrides[get_current_admin] = lambda: "admin-1"
+    yield
+    test_app.dependency_overrides.pop(get_current_admin, None)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_upload_removes_document_record(async_client, mock_repositories, as_admin):
+    files = {"file": ("homowo.pdf", BytesIO(b"%PDF-1.4"), "application/pdf")}
+    duplicate = ValueError("File already exists in storage: homowo.pdf")
+    mock_repositories.delete_one.return_value = MagicMock(deleted_count=1)
+
+    with patch("app.api.routers.admin.upload_document_streaming", AsyncMock(side_effect=duplicate)):
+        response = await async_client.post("/api/v1/admin/upload", files=files)
+
+    assert response.status_code == 409
+    created = mock_repositories.insert_one.await_args.args[0]
+    assert created["status"] == "uploading"
+    mock_repositories.delete_one.assert_awaited_once_with({"id": created["id"]})
@@ -0,0 +1,36 @@
+import warnings
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from app.api.deps import get_optional_user
+
+
+@pytest.fixture
+def as_user(test_app):
+    test_app.dependency_overrides[get_optional_user] = lambda: "user-1"
+    yield
+    test_app.dependency_overrides.pop(get_optional_user, None)
+
+
+@pytest.mark.asyncio
+async def test_conversation_messages_parse_mixed_timestamps(async_client, mock_repositories, as_user):
+    mock_repositories.find_one.return_value = {"id": "conv-1", "title": "Homowo", "updated_at": None}
+    # find() returns a cursor synchronously; only to_list() is awaited
+    mock_repositories.find = MagicMock()
+    cursor = mock_repositories.find.return_value.sort.return_value
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=[
+        {"id": "t1", "query": "what is homowo", "response": "A harvest festival.", "created_at": "2024-05-01T10:00:00+00:00"},
+        {"id": "t2", "query": "when is it held", "created_at": datetime(2024, 5, 1, 10, 5, tzinfo=timezone.utc)},
+    ])
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        response = await async_client.get("/api/v1/conversations/conv-1/messages")
+
+    assert response.status_code == 200
+    messages = response.json()["messages"]
+    assert [m["id"] for m in messages] == ["t1_q", "t1_a", "t2_q"]
+    assert messages[0]["created_at"].startswith("2024-05-01T10:00:00")
+    assert messages[2]["created_at"].startswith("2024-05-01T10:05:00")
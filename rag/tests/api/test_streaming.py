@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient as AsyncHTTPClient, ASGITransport
+
+from app.api.routes import coalesce_stream, stream_headers
+from app.main import ChatStreamAwareGZipMiddleware
+
+
+def _app_with_stream(path: str) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ChatStreamAwareGZipMiddleware, excluded_prefixes=("/api/v1/chat/",), minimum_size=1, compresslevel=5)
+
+    async def tokens():
+        for token in ("Ojekoo", " ", "nuumo"):
+            yield token.encode("utf-8")
+
+    @app.post(path)
+    async def stream():
+        return StreamingResponse(tokens(), media_type="text/plain", headers=stream_headers("conv-1"))
+
+    return app
+
+
+async def _post(app: FastAPI, path: str):
+    transport = ASGITransport(app=app)
+    async with AsyncHTTPClient(transport=transport, base_url="http://test") as client:
+        return await client.post(path, headers={"Accept-Encoding": "gzip"})
+
+
+@pytest.mark.asyncio
+async def test_streamed_answers_bypass_gzip():
+    """
+    Streamed chat answers must reach gzip-accepting clients uncompressed, chunk by chunk.
+    """
+    response = await _post(_app_with_stream("/api/v1/chat/new"), "/api/v1/chat/new")
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.headers["x-conversation-id"] == "conv-1"
+    assert response.content == b"Ojekoo nuumo"
+
+
+@pytest.mark.asyncio
+async def test_other_routes_are_still_compressed():
+    response = await _post(_app_with_stream("/api/v1/conversations"), "/api/v1/conversations")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == b"Ojekoo nuumo"
+
+
+async def _collect(stream) -> list[bytes]:
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_flushes_at_size_limit():
+    async def tokens():
+        for token in ("ab", "cd", "ef", "g"):
+            yield token
+
+    assert await _collect(coalesce_stream(tokens(), max_bytes=4, max_wait=60)) == [b"abcd", b"efg"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_flushes_after_max_wait():
+    async def tokens():
+        yield "Ojekoo"
+        await asyncio.sleep(0.2)
+        yield " nuumo"
+
+    assert await _collect(coalesce_stream(tokens(), max_bytes=4096, max_wait=0.01)) == [b"Ojekoo", b" nuumo"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_delivers_buffered_tokens_before_a_source_error():
+    async def tokens():
+        yield "Ojekoo"
+        yield " nuumo"
+        raise RuntimeError("llm stream dropped")
+
+    received = []
+    with pytest.raises(RuntimeError, match="llm stream dropped"):
+        async for chunk in coalesce_stream(tokens(), max_bytes=4096, max_wait=60):
+            received.append(chunk)
+
+    assert received == [b"Ojekoo nuumo"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_close_cancels_the_pending_read():
+    """A client disconnect closes the stream while the source is still waiting on the LLM."""
+    source_closed = asyncio.Event()
+
+    async def tokens():
+        try:
+            yield "Ojekoo"
+            await asyncio.sleep(60)
+            yield "never sent"
+        finally:
+            source_closed.set()
+
+    stream = coalesce_stream(tokens(), max_bytes=4096, max_wait=0.01)
+    assert await stream.__anext__() == b"Ojekoo"
+    await stream.aclose()
+
+    await asyncio.wait_for(source_closed.wait(), timeout=1)
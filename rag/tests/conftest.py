@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import tempfile
 from typing import AsyncGenerator
 from unittest.mock import AsyncMock, MagicMock
 from httpx import AsyncClient as AsyncHTTPClient, ASGITransport
@@ -8,6 +9,11 @@ from app.main import app
 from app.core.config import settings
 from app.storage.mongodb_client import MongoDBManager
 from app.storage.supabase_client import SupabaseManager
+from app.storage.providers import Repositories
+from app.storage.repositories.chat_sessions import ChatSessionRepository
+from app.storage.repositories.messages import MessageRepository
+from app.storage.repositories.documents import DocumentRepository
+from app.storage.repositories.ingestion_jobs import IngestionJobRepository
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -61,6 +67,26 @@ def mock_supabase_client():
     
     return mock_client
 
+@pytest.fixture
+def mock_qdrant_client():
+    """Fixture to mock the async Qdrant client."""
+    return AsyncMock()
+
+@pytest.fixture
+def mock_repositories(monkeypatch, mock_mongo_client):
+    """Serve real repositories backed by the mocked MongoDB client from the Repositories provider."""
+    monkeypatch.setattr(Repositories, "_chat", ChatSessionRepository(mock_mongo_client, "test_db"))
+    monkeypatch.setattr(Repositories, "_messages", MessageRepository(mock_mongo_client, "test_db"))
+    monkeypatch.setattr(Repositories, "_docs", DocumentRepository(mock_mongo_client, "test_db"))
+    monkeypatch.setattr(Repositories, "_jobs", IngestionJobRepository(mock_mongo_client, "test_db"))
+    return mock_mongo_client._mock_collection
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    """Send temp files (upload spools, PDF copies) to an empty directory the test can inspect."""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    return tmp_path
+
 @pytest.fixture(autouse=True)
 def patch_database_managers(monkeypatch, mock_mongo_client, mock_supabase_client):
     """Automatically patch MongoDB and Supabase managers to use mocks during tests."""
@@ -0,0 +1,104 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core.cache import llm_cache, response_cache
+from app.rag import service
+
+
+@pytest.fixture
+def engine_calls(mock_repositories):
+    """
+    Run ask() with fake engines and embeddings; storage comes from the conftest Mongo mock.
+    Every engine call is recorded so tests can tell a cache hit from a fresh answer.
+    """
+    llm_cache.clear()
+    response_cache.clear()
+    calls = []
+
+    def fake_engine(name):
+        async def engine(query, *args, **kwargs):
+            calls.append((name, query))
+            yield f"{name} answer to {query}"
+        return engine
+
+    vectors = {}
+
+    async def embed(query):
+        # Paraphrases in the tests share a vector; everything else gets its own direction
+        key = query.lower().rstrip("?!. ")
+        return vectors.setdefault(key, [float(len(vectors) == i) for i in range(32)])
+
+    with patch.object(service, "ask_bible", fake_engine("bible")), \
+         patch.object(service, "ask_general", fake_engine("general")), \
+         patch.object(service, "_embed_query", side_effect=embed), \
+         patch.object(service, "_load_memory_window", AsyncMock(return_value=[])), \
+         patch.object(service, "_persist_turn", AsyncMock()):
+        yield calls
+
+    llm_cache.clear()
+    response_cache.clear()
+
+
+async def _answer(query, conversation_id="conv-1", mode="auto"):
+    return "".join([t async for t in service.ask(query, conversation_id, "user-1", stream=False, mode=mode)])
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_served_from_cache(engine_calls):
+    first = await _answer("Tell me about Homowo")
+    second = await _answer("tell me about homowo")
+
+    assert second == first
+    assert engine_calls == [("general", "Tell me about Homowo")]
+
+
+@pytest.mark.asyncio
+async def test_citation_query_in_auto_mode_hits_cache(engine_calls):
+    """The citation router rewrites mode to "bible"; the cache must still key on "auto"."""
+    await _answer("Genesis 1:1")
+    await _answer("Genesis 1:1")
+
+    assert engine_calls == [("bible", "Genesis 1:1")]
+
+
+@pytest.mark.asyncio
+async def test_cache_is_scoped_to_conversation_and_mode(engine_calls):
+    await _answer("Tell me about Homowo", conversation_id="conv-1")
+    await _answer("Tell me about Homowo", conversation_id="conv-2")
+    await _answer("Tell me about Homowo", conversation_id="conv-1", mode="bible")
+
+    assert len(engine_calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_paraphrase_hits_semantic_cache(engine_calls):
+    await _answer("Tell me about Homowo")
+    await _answer("Tell me about Homowo?")
+
+    assert engine_calls == [("general", "Tell me about Homowo")]
+
+
+@pytest.mark.asyncio
+async def test_numeric_queries_skip_semantic_cache(engine_calls):
+    """Near-identical embeddings of "1 to 10" and "1 to 12" must not share an answer."""
+    await _answer("Count from 1 to 10")
+    await _answer("Count from 1 to 10?")
+
+    assert len(engine_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_new_conversation_is_never_served_from_cache(engine_calls):
+    await _answer("Tell me about Homowo", conversation_id=None)
+    await _answer("Tell me about Homowo", conversation_id=None)
+
+    assert len(engine_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_embedding_failure_yields_routing_fallback(engine_calls):
+    with patch.object(service, "_embed_query", AsyncMock(side_effect=RuntimeError("model not loaded"))):
+        answer = await _answer("Tell me about Homowo")
+
+    assert "having trouble routing" in answer
+    assert engine_calls == []
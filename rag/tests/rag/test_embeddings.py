@@ -0,0 +1,35 @@
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.rag import embeddings
+
+
+@pytest.mark.asyncio
+async def test_first_aembed_loads_the_model_off_the_event_loop():
+    model = MagicMock()
+    model.aget_query_embedding = AsyncMock(return_value=[0.1, 0.2])
+    loaded_on = []
+
+    def load():
+        loaded_on.append(threading.current_thread().name)
+        return model
+
+    with patch.object(embeddings, "_embeddings_instance", None), \
+         patch.object(embeddings, "get_embeddings", side_effect=load):
+        assert await embeddings.aembed("homowo") == [0.1, 0.2]
+
+    assert loaded_on and loaded_on[0].startswith("emb")
+    model.aget_query_embedding.assert_awaited_once_with("homowo")
+
+
+@pytest.mark.asyncio
+async def test_loaded_model_is_used_without_an_executor_hop():
+    model = MagicMock()
+    model.aget_query_embedding = AsyncMock(return_value=[0.3])
+
+    with patch.object(embeddings, "_embeddings_instance", model), \
+         patch.object(embeddings, "get_embeddings") as mock_get:
+        assert await embeddings.aembed("homowo") == [0.3]
+
+    mock_get.assert_not_called()
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from app.core.cache import document_indexed_cache
+from app.rag import indexer
+
+
+@pytest.mark.asyncio
+async def test_index_directory_reads_files_within_concurrency_bound(tmp_path, monkeypatch):
+    for i in range(6):
+        (tmp_path / f"story_{i}.txt").write_bytes(f"story {i}".encode())
+    (tmp_path / "broken.txt").write_bytes(b"broken")
+    monkeypatch.setattr(indexer, "INDEX_CONCURRENCY", 2)
+
+    active = 0
+    peak = 0
+
+    async def build(content, file_path, metadata):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if content == b"broken":
+            raise ValueError("unreadable document")
+        return "heritage_documents", [file_path]
+
+    with patch.object(indexer, "build_nodes_from_bytes", side_effect=build), \
+         patch.object(indexer, "_insert_nodes", new_callable=AsyncMock) as mock_insert:
+        await indexer.index_directory(str(tmp_path), metadata={"category": "heritage"})
+
+    assert peak <= 2
+    # One insert for the collection, with every file except the broken one
+    mock_insert.assert_awaited_once()
+    collection_name, nodes, _ = mock_insert.await_args.args
+    assert collection_name == "heritage_documents"
+    assert sorted(nodes) == sorted(str(tmp_path / f"story_{i}.txt") for i in range(6))
+
+
+@pytest.fixture
+def indexed_by_key(mock_qdrant_client):
+    """Indexed values per payload key, served by the mocked Qdrant client's facet()."""
+    document_indexed_cache.clear()
+    indexed = {"file_path": [], "filename": []}
+
+    async def facet(collection_name, key, facet_filter, limit, exact):
+        requested = facet_filter.must[0].match.any
+        hits = [SimpleNamespace(value=v, count=3) for v in indexed[key] if v in requested]
+        return SimpleNamespace(hits=hits[:limit])
+
+    mock_qdrant_client.facet.side_effect = facet
+    with patch.object(indexer, "get_async_qdrant_client", return_value=mock_qdrant_client), \
+         patch.object(indexer, "acollection_exists", AsyncMock(return_value=True)):
+        yield indexed
+
+    document_indexed_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_batch_check_uses_facets_for_both_keys(indexed_by_key, mock_qdrant_client):
+    indexed_by_key["file_path"] = ["a.pdf"]
+    indexed_by_key["filename"] = ["legacy.txt"]
+
+    indexed = await indexer.is_document_indexed_batch(["a.pdf", "legacy.txt", "new.docx"])
+
+    assert indexed == {"a.pdf", "legacy.txt"}
+    assert mock_qdrant_client.facet.await_count == 2
+    # The legacy key is only asked about what file_path didn't find
+    assert mock_qdrant_client.facet.await_args_list[1].kwargs["facet_filter"].must[0].match.any == ["legacy.txt", "new.docx"]
+
+
+@pytest.mark.asyncio
+async def test_batch_check_caches_hits_and_misses(indexed_by_key, mock_qdrant_client):
+    indexed_by_key["file_path"] = ["a.pdf"]
+
+    await indexer.is_document_indexed_batch(["a.pdf", "new.docx"])
+    mock_qdrant_client.facet.reset_mock()
+    indexed = await indexer.is_document_indexed_batch(["a.pdf", "new.docx"])
+
+    assert indexed == {"a.pdf"}
+    mock_qdrant_client.facet.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_batch_check_falls_back_to_per_file_checks(indexed_by_key, mock_qdrant_client):
+    mock_qdrant_client.facet.side_effect = RuntimeError("facet not supported")
+
+    with patch.object(indexer, "is_document_indexed", AsyncMock(side_effect=lambda fp: fp == "a.pdf")) as mock_single:
+        indexed = await indexer.is_document_indexed_batch(["a.pdf", "new.docx"])
+
+    assert indexed == {"a.pdf"}
+    assert mock_single.await_count == 2
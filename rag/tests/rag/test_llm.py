@@ -0,0 +1,23 @@
+import pytest
+
+from app.core.http import close_http_client, get_http_client
+from app.rag import service
+from app.rag.llm import get_llm
+
+OPENROUTER_MODEL = "meta-llama/llama-3-8b-instruct"
+
+
+@pytest.mark.asyncio
+async def test_llms_are_rebuilt_after_http_client_closes():
+    llm = get_llm(temperature=0, model=OPENROUTER_MODEL)
+    chain = service._persona_chain(OPENROUTER_MODEL, True)
+    assert get_llm(temperature=0, model=OPENROUTER_MODEL) is llm
+
+    await close_http_client()
+    service.reset_llm_chains()
+
+    fresh = get_llm(temperature=0, model=OPENROUTER_MODEL)
+    assert fresh is not llm
+    assert fresh.http_async_client is get_http_client()
+    assert not fresh.http_async_client.is_closed
+    assert service._persona_chain(OPENROUTER_MODEL, True) is not chain
@@ -0,0 +1,40 @@
+from app.rag.memory import trim_memory_window
+
+
+def _turns(*contents):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": c} for i, c in enumerate(contents)]
+
+
+def test_short_history_is_kept_whole():
+    messages = _turns("hello", "Hɛloo!", "what is homowo")
+
+    assert trim_memory_window(messages) == messages
+
+
+def test_long_messages_are_cut_to_the_per_message_budget():
+    trimmed = trim_memory_window(_turns("a" * 50), max_message_chars=10, max_total_chars=100)
+
+    assert trimmed == [{"role": "user", "content": "a" * 10 + "…"}]
+
+
+def test_total_budget_keeps_the_newest_messages_in_order():
+    messages = _turns("oldest " * 3, "older", "newer", "newest")
+
+    trimmed = trim_memory_window(messages, max_message_chars=100, max_total_chars=16)
+
+    assert [m["content"] for m in trimmed] == ["older", "newer", "newest"]
+    assert [m["role"] for m in trimmed] == ["assistant", "user", "assistant"]
+
+
+def test_message_that_overflows_the_budget_drops_it_and_everything_older():
+    messages = _turns("old", "x" * 20, "new")
+
+    assert [m["content"] for m in trim_memory_window(messages, max_total_chars=10)] == ["new"]
+
+
+def test_original_messages_are_not_modified():
+    messages = _turns("b" * 50)
+
+    trim_memory_window(messages, max_message_chars=10)
+
+    assert messages[0]["content"] == "b" * 50
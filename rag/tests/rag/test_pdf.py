@@ -0,0 +1,34 @@
+import fitz
+import pytest
+
+from app.rag import pdf
+
+
+def _build_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {i}")
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+def test_small_pdf_is_extracted_in_process(spool_dir):
+    text = pdf.extract_pdf_text(_build_pdf(3))
+
+    assert [line for line in text.splitlines() if line] == ["Page 0", "Page 1", "Page 2"]
+    assert pdf._pdf_executor is None
+
+
+def test_large_pdf_is_split_across_workers_in_page_order(spool_dir, monkeypatch):
+    monkeypatch.setattr(pdf, "PARALLEL_PAGE_THRESHOLD", 2)
+    monkeypatch.setattr(pdf.os, "cpu_count", lambda: 3)
+    try:
+        text = pdf.extract_pdf_text(_build_pdf(12))
+    finally:
+        pdf.shutdown_pdf_executor()
+
+    assert [line for line in text.splitlines() if line] == [f"Page {i}" for i in range(12)]
+    # The shared temp copy is removed once the workers are done
+    assert list(spool_dir.iterdir()) == []
+    assert pdf._pdf_executor is None
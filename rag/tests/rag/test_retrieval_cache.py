@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from cachetools import LRUCache
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from app.core.cache import is_semantically_cacheable, retrieval_cache
+from app.rag import retriever
+
+
+@pytest.mark.parametrize("query,cacheable", [
+    ("tell me about homowo", True),
+    ("who founded accra", True),
+    ("count from 1 to 10 in ga", False),
+    ("how do you say 7 in ga", False),
+    ("give me a random proverb", False),
+])
+def test_is_semantically_cacheable(query, cacheable):
+    assert is_semantically_cacheable(query) is cacheable
+
+
+@pytest.fixture
+def recorded_search():
+    """retrieve_context() against a fake Qdrant; records every embedding and search call."""
+    retrieval_cache.clear()
+    embedded, searched = [], []
+
+    def embed(variations):
+        embedded.append(list(variations))
+        return [[1.0, 0.0, 0.0] for _ in variations]
+
+    def search(collection_name, vectors, top_k, filters):
+        searched.append(collection_name)
+        return [[NodeWithScore(node=TextNode(text=f"Homowo chunk from {collection_name}"), score=0.8)] for _ in vectors]
+
+    with patch.object(retriever, "_embed_variations", side_effect=embed), \
+         patch.object(retriever, "_search_variations", side_effect=search):
+        yield embedded, searched
+
+    retrieval_cache.clear()
+
+
+def test_cache_hit_skips_variation_embedding(recorded_search):
+    embedded, searched = recorded_search
+    query_vector = [1.0, 0.0, 0.0]
+
+    first = retriever.retrieve_context("tell me about homowo", allowed_collections=["heritage_documents"], query_embedding=query_vector)
+    embedded.clear()
+    searched.clear()
+    second = retriever.retrieve_context("tell me about homowo", allowed_collections=["heritage_documents"], query_embedding=query_vector)
+
+    assert second == first
+    assert embedded == []
+    assert searched == []
+
+
+def test_numeric_queries_always_search(recorded_search):
+    embedded, searched = recorded_search
+    query_vector = [1.0, 0.0, 0.0]
+
+    retriever.retrieve_context("how do you say 7 in ga", allowed_collections=["heritage_documents"], query_embedding=query_vector)
+    retriever.retrieve_context("how do you say 8 in ga", allowed_collections=["heritage_documents"], query_embedding=query_vector)
+
+    assert searched == ["heritage_documents", "heritage_documents"]
+
+
+def test_embed_variations_survives_eviction():
+    """Vectors come from the batch call, not a cache re-read that a concurrent insert could evict."""
+    embeddings = MagicMock()
+    embeddings.get_text_embedding_batch.side_effect = lambda texts: [[float(len(t))] for t in texts]
+
+    with patch.object(retriever, "embedding_cache", LRUCache(maxsize=1)), \
+         patch.object(retriever, "get_embeddings", return_value=embeddings):
+        vectors = retriever._embed_variations(["homowo", "homowo festival", "ga homowo festival"])
+
+    assert vectors == [[6.0], [15.0], [18.0]]
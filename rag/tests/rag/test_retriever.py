@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores import FilterCondition, FilterOperator, MetadataFilter, MetadataFilters
+from llama_index.core.vector_stores.types import VectorStoreQueryResult
+from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue
+
+from app.rag import retriever
+
+
+def test_equality_filters_become_must_conditions():
+    filters = MetadataFilters(filters=[
+        MetadataFilter(key="category", value="bible"),
+        MetadataFilter(key="chapter_num", value=3),
+    ])
+
+    assert retriever._to_qdrant_filter(filters) == Filter(must=[
+        FieldCondition(key="category", match=MatchValue(value="bible")),
+        FieldCondition(key="chapter_num", match=MatchValue(value=3)),
+    ])
+
+
+def test_or_and_in_filters():
+    filters = MetadataFilters(
+        filters=[MetadataFilter(key="book", value=["genesis", "exodus"], operator=FilterOperator.IN)],
+        condition=FilterCondition.OR
+    )
+
+    assert retriever._to_qdrant_filter(filters) == Filter(should=[
+        FieldCondition(key="book", match=MatchAny(any=["genesis", "exodus"])),
+    ])
+
+
+def test_no_filters_means_no_qdrant_filter():
+    assert retriever._to_qdrant_filter(None) is None
+    assert retriever._to_qdrant_filter(MetadataFilters(filters=[])) is None
+
+
+def test_unsupported_operator_is_rejected():
+    filters = MetadataFilters(filters=[MetadataFilter(key="verse_num", value=3, operator=FilterOperator.GT)])
+
+    with pytest.raises(ValueError, match="verse_num"):
+        retriever._to_qdrant_filter(filters)
+
+
+def test_search_variations_sends_one_batch_query_per_collection():
+    vector_store = MagicMock()
+    vector_store.client.query_batch_points.return_value = [MagicMock(points=[]), MagicMock(points=[])]
+    node = TextNode(text="Homowo is the Ga harvest festival.")
+    vector_store.parse_to_query_result.return_value = VectorStoreQueryResult(nodes=[node], similarities=[0.8])
+    filters = MetadataFilters(filters=[MetadataFilter(key="category", value="story")])
+
+    with patch.object(retriever, "get_index", return_value=MagicMock(vector_store=vector_store)):
+        results = retriever._search_variations("heritage_documents", [[1.0, 0.0], [0.0, 1.0]], 5, filters)
+
+    kwargs = vector_store.client.query_batch_points.call_args.kwargs
+    assert kwargs["collection_name"] == "heritage_documents"
+    assert [r.query for r in kwargs["requests"]] == [[1.0, 0.0], [0.0, 1.0]]
+    assert all(r.using is None and r.limit == 5 for r in kwargs["requests"])
+    assert kwargs["requests"][0].filter == Filter(must=[FieldCondition(key="category", match=MatchValue(value="story"))])
+    assert [[n.score for n in nodes] for nodes in results] == [[0.8], [0.8]]
@@ -0,0 +1,44 @@
+import pytest
+
+from app.rag.service import BIBLE_CITATION_RE, GREETING_REPLIES, GREETING_RE
+
+
+@pytest.mark.parametrize("query,greeting", [
+    ("hi", "hi"),
+    ("hello!", "hello"),
+    ("ojekoo", "ojekoo"),
+    ("good morning.", "good morning"),
+    ("how are you?", "how are you"),
+    ("hɛloo  !", "hɛloo"),
+])
+def test_bare_greetings_match(query, greeting):
+    match = GREETING_RE.match(query)
+    assert match is not None
+    assert match.group(1) == greeting
+    assert match.group(1) in GREETING_REPLIES
+
+
+@pytest.mark.parametrize("query", [
+    "hi, what is homowo",
+    "hello nii obodai tell me a story",
+    "history of the ga people",
+    "this",
+    "",
+])
+def test_questions_are_not_greetings(query):
+    assert GREETING_RE.match(query) is None
+
+
+@pytest.mark.parametrize("query,book,chapter,verse", [
+    ("genesis 1:1", "genesis", "1", "1"),
+    ("what does exodus 20 3 say", "exodus", "20", "3"),
+    ("read mose 2", "mose", "2", None),
+])
+def test_bible_citations_are_detected(query, book, chapter, verse):
+    match = BIBLE_CITATION_RE.search(query)
+    assert match is not None
+    assert match.groups() == (book, chapter, verse)
+
+
+def test_plain_questions_are_not_citations():
+    assert BIBLE_CITATION_RE.search("who wrote the book of genesis") is None
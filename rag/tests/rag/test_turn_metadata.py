@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.rag import service
+
+METADATA_GENERATORS = ("generate_title_and_summary", "generate_conversation_title", "summarize_conversation_messages")
+
+
+@pytest.fixture
+def generators():
+    """Title/summary generation mocked out; tests check which ones a turn triggers."""
+    mocks = {name: AsyncMock() for name in METADATA_GENERATORS}
+    with patch.multiple(service, **mocks):
+        yield mocks
+
+
+def _called(generators):
+    return {name for name, mock in generators.items() if mock.await_count}
+
+
+def _turn_count_writes(collection):
+    return [c for c in collection.find_one_and_update.await_args_list if "$inc" in c.args[1]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("turn,expected", [
+    (1, {"generate_conversation_title"}),
+    (2, set()),
+    (3, {"generate_title_and_summary"}),
+    (4, set()),
+    (6, {"summarize_conversation_messages"}),
+])
+async def test_metadata_refresh_follows_turn_count(mock_repositories, generators, turn, expected):
+    mock_repositories.find_one_and_update.return_value = {"turn_count": turn}
+
+    await service._persist_turn("conv-1", "what is homowo", "A harvest festival.", "user-1", refresh_metadata=True)
+
+    mock_repositories.insert_one.assert_awaited_once()
+    assert len(_turn_count_writes(mock_repositories)) == 1
+    assert _called(generators) == expected
+
+
+@pytest.mark.asyncio
+async def test_missing_session_refreshes_nothing(mock_repositories, generators):
+    mock_repositories.find_one_and_update.return_value = None
+
+    await service._persist_turn("conv-1", "what is homowo", "A harvest festival.", "user-1", refresh_metadata=True)
+
+    assert _called(generators) == set()
+
+
+@pytest.mark.asyncio
+async def test_cached_turns_are_not_counted(mock_repositories, generators):
+    await service._persist_turn("conv-1", "what is homowo", "A harvest festival.", "user-1")
+
+    mock_repositories.insert_one.assert_awaited_once()
+    assert _turn_count_writes(mock_repositories) == []
+    # The activity timestamp is still refreshed
+    mock_repositories.find_one_and_update.assert_awaited_once()
+    assert _called(generators) == set()
+
+
+@pytest.mark.asyncio
+async def test_memory_window_load_makes_no_llm_calls(generators):
+    messages = [
+        {"role": "user", "content": "what is homowo", "created_at": "2024-01-01"},
+        {"role": "assistant", "content": "A harvest festival.", "created_at": "2024-01-01"},
+        {"role": "user", "content": "when is it held", "created_at": "2024-01-02"},
+    ]
+
+    with patch.object(service, "get_messages_helper", AsyncMock(return_value=messages)):
+        window = await service._load_memory_window("conv-1", "user-1")
+
+    assert window == [{"role": m["role"], "content": m["content"]} for m in messages]
+    assert _called(generators) == set()
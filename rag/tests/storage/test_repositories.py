@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
+from pymongo.errors import PyMongoError
 from app.storage.repositories.base import BaseRepository
 from app.storage.repositories.documents import DocumentRepository
 from app.storage.repositories.chat_sessions import ChatSessionRepository
@@ -74,3 +75,28 @@ async def test_base_repository_delete(mock_mongo_client):
     
     assert success is True
     mock_mongo_client._mock_collection.delete_one.assert_called_once_with({"id": "123"})
+
+@pytest.mark.asyncio
+async def test_record_turn_increments_and_returns_count(mock_mongo_client):
+    repo = ChatSessionRepository(mock_mongo_client, "test_db")
+    mock_mongo_client._mock_collection.find_one_and_update.return_value = {"turn_count": 4}
+
+    assert await repo.record_turn("conv-1") == 4
+    query, update = mock_mongo_client._mock_collection.find_one_and_update.await_args.args
+    assert query == {"id": "conv-1"}
+    assert update["$inc"] == {"turn_count": 1}
+
+@pytest.mark.asyncio
+async def test_record_turn_on_missing_session_returns_zero(mock_mongo_client):
+    repo = ChatSessionRepository(mock_mongo_client, "test_db")
+    mock_mongo_client._mock_collection.find_one_and_update.return_value = None
+
+    assert await repo.record_turn("missing") == 0
+
+@pytest.mark.asyncio
+async def test_record_turn_logs_write_failure(mock_mongo_client, caplog):
+    repo = ChatSessionRepository(mock_mongo_client, "test_db")
+    mock_mongo_client._mock_collection.find_one_and_update.side_effect = PyMongoError("primary stepped down")
+
+    assert await repo.record_turn("conv-1") == 0
+    assert "Failed to record turn for session conv-1" in caplog.text
@@ -0,0 +1,105 @@
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+from storage3.exceptions import StorageApiError
+
+from app.core.resilience import _is_transient_storage_error
+from app.storage import supabase as storage
+
+
+class FakeUpload:
+    """UploadFile stand-in that yields `chunks`, then raises `error` if given."""
+
+    def __init__(self, chunks, error=None):
+        self.chunks = list(chunks)
+        self.error = error
+
+    async def read(self, size=-1):
+        if self.chunks:
+            return self.chunks.pop(0)
+        if self.error:
+            raise self.error
+        return b""
+
+
+@pytest.fixture
+def mock_bucket(mock_supabase_client):
+    return mock_supabase_client._mock_bucket
+
+
+@pytest.mark.asyncio
+async def test_streaming_upload_spools_and_cleans_up(spool_dir, mock_bucket):
+    url, size = await storage.upload_document_streaming(FakeUpload([b"abc", b"de"]), "archive/story.pdf")
+
+    assert size == 5
+    assert url.endswith("archive/story.pdf")
+    mock_bucket.upload.assert_awaited_once()
+    assert list(spool_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_interrupted_spool_does_not_leak_temp_file(spool_dir, mock_bucket):
+    upload = FakeUpload([b"abc"], error=ConnectionResetError("client went away"))
+
+    with pytest.raises(ConnectionResetError):
+        await storage.upload_document_streaming(upload, "archive/story.pdf")
+
+    mock_bucket.upload.assert_not_awaited()
+    assert list(spool_dir.iterdir()) == []
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://storage.test/object")
+    return httpx.HTTPStatusError("storage error", request=request, response=httpx.Response(status, request=request))
+
+
+@pytest.mark.parametrize("exc,transient", [
+    (httpx.ConnectError("connection refused"), True),
+    (httpx.ReadTimeout("timed out"), True),
+    (_status_error(503), True),
+    (_status_error(404), False),
+    (StorageApiError("gateway", "InternalError", 502), True),
+    (StorageApiError("gateway", "InternalError", "500"), True),
+    (StorageApiError("exists", "Duplicate", "409"), False),
+    (StorageApiError("denied", "Unauthorized", 403), False),
+    (ValueError("not a storage error"), False),
+])
+def test_transient_storage_error_classification(exc, transient):
+    assert _is_transient_storage_error(exc) is transient
+
+
+@pytest.mark.asyncio
+async def test_existing_file_is_rejected_without_overwrite(spool_dir, mock_bucket):
+    mock_bucket.upload.side_effect = StorageApiError("exists", "Duplicate", "409")
+
+    with pytest.raises(ValueError, match="already exists"):
+        await storage.upload_document_streaming(FakeUpload([b"abc"]), "archive/story.pdf")
+
+    mock_bucket.upload.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_duplicate_after_lost_response_counts_as_success(spool_dir, mock_bucket):
+    """The first attempt stored the object but its response was lost; the retry sees a 409."""
+    mock_bucket.upload.side_effect = [
+        StorageApiError("bad gateway", "InternalError", 502),
+        StorageApiError("exists", "Duplicate", "409"),
+    ]
+
+    with patch.object(storage, "get_storage_file_size", AsyncMock(return_value=3)):
+        _, size = await storage.upload_document_streaming(FakeUpload([b"abc"]), "archive/story.pdf")
+
+    assert size == 3
+    assert mock_bucket.upload.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_duplicate_of_a_different_object_on_retry_is_rejected(spool_dir, mock_bucket):
+    mock_bucket.upload.side_effect = [
+        StorageApiError("bad gateway", "InternalError", 502),
+        StorageApiError("exists", "Duplicate", "409"),
+    ]
+
+    with patch.object(storage, "get_storage_file_size", AsyncMock(return_value=999)):
+        with pytest.raises(ValueError, match="already exists"):
+            await storage.upload_document_streaming(FakeUpload([b"abc"]), "archive/story.pdf")
@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.workers import index_worker
+
+
+@pytest.mark.asyncio
+async def test_requested_check_runs_without_periodic_indexer():
+    with patch.object(index_worker, "check_and_index_storage_files", AsyncMock(return_value=1)) as mock_check:
+        index_worker.request_index_check()
+        index_worker.request_index_check()
+        await index_worker._requested_check_task
+
+    mock_check.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_request_during_check_gets_one_follow_up():
+    async def check():
+        # Webhooks keep arriving while the first scan runs; they coalesce into one more scan
+        if mock_check.await_count == 1:
+            index_worker.request_index_check()
+            index_worker.request_index_check()
+        return 0
+
+    with patch.object(index_worker, "check_and_index_storage_files", AsyncMock(side_effect=check)) as mock_check:
+        index_worker.request_index_check()
+        await index_worker._requested_check_task
+
+    assert mock_check.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_requested_check_is_logged_not_raised():
+    with patch.object(index_worker, "check_and_index_storage_files", AsyncMock(side_effect=RuntimeError("qdrant down"))):
+        index_worker.request_index_check()
+        await index_worker._requested_check_task
+
+    assert not index_worker._index_requested.is_set()
+
+
+@pytest.mark.asyncio
+async def test_check_indexes_concurrently_and_counts_errors(monkeypatch):
+    monkeypatch.setattr(index_worker, "WORKER_INDEX_CONCURRENCY", 2)
+    storage_files = ["done.pdf", "a.pdf", "b.pdf", "broken.pdf", "c.pdf"]
+    active = 0
+    peak = 0
+
+    async def index(file_path, metadata):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if file_path == "broken.pdf":
+            raise ValueError("corrupt archive")
+
+    with patch.object(index_worker, "acollection_exists", AsyncMock(return_value=True)), \
+         patch.object(index_worker, "list_storage_files", AsyncMock(return_value=storage_files)), \
+         patch.object(index_worker, "is_document_indexed_batch", AsyncMock(return_value={"done.pdf"})), \
+         patch.object(index_worker, "index_document_from_storage", AsyncMock(side_effect=index)) as mock_index:
+        indexed = await index_worker.check_and_index_storage_files()
+
+    # Failures are counted and skipped rather than aborting the other files
+    assert indexed == 3
+    assert mock_index.await_count == 4
+    assert 1 < peak <= 2
+
+
+@pytest.mark.asyncio
+async def test_check_skips_when_collection_is_missing():
+    with patch.object(index_worker, "acollection_exists", AsyncMock(return_value=False)), \
+         patch.object(index_worker, "list_storage_files", AsyncMock()) as mock_list:
+        assert await index_worker.check_and_index_storage_files() == 0
+
+    mock_list.assert_not_awaited()
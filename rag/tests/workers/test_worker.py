@@ -16,19 +16,9 @@ async def test_process_document_job_success(mock_mongo_client):
     
     mock_mongo_client._mock_collection.find_one_and_update.return_value = job_record
     
-    # find_one side effects:
-    # 1. job_repo.start_job -> update -> find_one (job)
-    # 2. doc_repo.get_by_id -> find_one (doc)
-    # 3. doc_repo.update_status -> update -> find_one (doc)
-    # 4. job_repo.update (finish) -> update -> find_one (job)
-    # 5. doc_repo.update_status (finish) -> update -> find_one (doc)
-    mock_mongo_client._mock_collection.find_one.side_effect = [
-        job_record,
-        doc_record,
-        doc_record,
-        job_record,
-        doc_record
-    ]
+    # Updates return the document from find_one_and_update itself, so the only
+    # find_one is doc_repo.get_by_id
+    mock_mongo_client._mock_collection.find_one.side_effect = [doc_record]
 
     # 2. Mock indexing service
     with patch("app.workers.ingestion_worker.index_document_from_storage", new_callable=AsyncMock) as mock_index:
@@ -64,11 +54,7 @@ async def test_process_document_job_failure(mock_mongo_client):
     mock_mongo_client._mock_collection.find_one_and_update.return_value = job_record
     
     mock_mongo_client._mock_collection.find_one.side_effect = [
-        job_record, # start_job
-        doc_record, # get_by_id
-        doc_record, # update_status (processing)
-        job_record, # update (failed)
-        doc_record  # update_status (failed)
+        doc_record  # get_by_id
     ]
 
     with patch("app.workers.ingestion_worker.index_document_from_storage", new_callable=AsyncMock) as mock_index: